@@ -1,15 +1,22 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models import Client as ClientModel
+from app.api.pagination import paginate
 from app.api.schemas import Client, ClientCreate, ClientUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Client])
-def get_clients(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    clients = db.query(ClientModel).offset(skip).limit(limit).all()
+def get_clients(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    clients = paginate(db.query(ClientModel), ClientModel, response, skip, limit, cursor)
     return clients
 
 @router.get("/{client_id}", response_model=Client)
@@ -1,17 +1,65 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_async_db, get_db
 from app.models import Driver as DriverModel
-from app.api.schemas import Driver, DriverCreate, DriverUpdate
+from app.api.pagination import paginate
+from app.api.schemas import Driver, DriverCreate, DriverUpdate, NearbyDriver
+from app.services.driver_locations import driver_index, geocode_driver, geocode_missing_drivers
+from app.services.eta_service import eta_service
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Driver])
-def get_drivers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    drivers = db.query(DriverModel).offset(skip).limit(limit).all()
+def get_drivers(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    drivers = paginate(db.query(DriverModel), DriverModel, response, skip, limit, cursor)
     return drivers
 
+async def _drivers_by_id(db: AsyncSession, driver_ids: List[int]) -> dict:
+    return {driver.id: driver for driver in await db.scalars(select(DriverModel).where(DriverModel.id.in_(driver_ids)))}
+
+# Declared before /{driver_id} so "nearby" isn't parsed as an id
+@router.get("/nearby", response_model=List[NearbyDriver])
+async def get_nearby_drivers(
+    latitude: Optional[float] = Query(None, ge=-90, le=90),
+    longitude: Optional[float] = Query(None, ge=-180, le=180),
+    address: Optional[str] = None,
+    k: int = Query(5, ge=1, le=100),
+    min_capacity: float = 0.0,
+    max_distance_km: Optional[float] = Query(None, gt=0),
+    available_only: bool = True,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Nearest geocoded drivers to a point, or to an address geocoded on the fly"""
+    if latitude is None or longitude is None:
+        if not address:
+            raise HTTPException(status_code=400, detail="Give latitude and longitude, or an address")
+        coords = await eta_service._geocode_address(address)
+        if coords is None:
+            raise HTTPException(status_code=404, detail="Could not geocode address")
+        longitude, latitude = coords
+    
+    nearest = driver_index.nearest(latitude, longitude, k, min_capacity, available_only, max_distance_km)
+    drivers = await _drivers_by_id(db, [driver_id for driver_id, _ in nearest])
+    return [
+        NearbyDriver(**Driver.model_validate(drivers[driver_id]).model_dump(), distance_km=round(distance, 3))
+        for driver_id, distance in nearest if driver_id in drivers
+    ]
+
+@router.post("/locations/geocode")
+async def geocode_driver_locations(limit: int = Query(settings.driver_geocode_batch_size, ge=1)):
+    """Geocode drivers that have no coordinates yet, e.g. after a bulk upload"""
+    return {"geocoded": await geocode_missing_drivers(limit)}
+
 @router.get("/{driver_id}", response_model=Driver)
 def get_driver(driver_id: int, db: Session = Depends(get_db)):
     driver = db.query(DriverModel).filter(DriverModel.id == driver_id).first()
@@ -20,7 +68,7 @@ def get_driver(driver_id: int, db: Session = Depends(get_db)):
     return driver
 
 @router.post("/", response_model=Driver, status_code=status.HTTP_201_CREATED)
-def create_driver(driver: DriverCreate, db: Session = Depends(get_db)):
+def create_driver(driver: DriverCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     # Check if email or license number already exists
     db_driver = db.query(DriverModel).filter(
         (DriverModel.email == driver.email) | 
@@ -33,10 +81,12 @@ def create_driver(driver: DriverCreate, db: Session = Depends(get_db)):
     db.add(db_driver)
     db.commit()
     db.refresh(db_driver)
+    if db_driver.latitude is None or db_driver.longitude is None:
+        background_tasks.add_task(geocode_driver, db_driver.id, db_driver.current_location)
     return db_driver
 
 @router.put("/{driver_id}", response_model=Driver)
-def update_driver(driver_id: int, driver: DriverUpdate, db: Session = Depends(get_db)):
+def update_driver(driver_id: int, driver: DriverUpdate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     db_driver = db.query(DriverModel).filter(DriverModel.id == driver_id).first()
     if db_driver is None:
         raise HTTPException(status_code=404, detail="Driver not found")
@@ -53,11 +103,20 @@ def update_driver(driver_id: int, driver: DriverUpdate, db: Session = Depends(ge
             raise HTTPException(status_code=400, detail="License number already registered")
     
     update_data = driver.model_dump(exclude_unset=True)
+    # A new location without coordinates invalidates the old ones until it's geocoded
+    relocated = (
+        update_data.get("current_location") not in (None, db_driver.current_location)
+        and ("latitude" not in update_data or "longitude" not in update_data)
+    )
+    if relocated:
+        update_data.update(latitude=None, longitude=None)
     for field, value in update_data.items():
         setattr(db_driver, field, value)
     
     db.commit()
     db.refresh(db_driver)
+    if relocated:
+        background_tasks.add_task(geocode_driver, db_driver.id, db_driver.current_location)
     return db_driver
 
 @router.delete("/{driver_id}")
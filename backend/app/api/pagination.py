@@ -0,0 +1,42 @@
+import base64
+import binascii
+import json
+from typing import Optional
+from fastapi import HTTPException, Response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Optional[int]:
+    """Return the last id seen from an opaque cursor, or None for an empty cursor"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(query, model, response: Response, skip: int, limit: int, cursor: Optional[str] = None) -> list:
+    """Fetch one page ordered by id.
+    
+    With a cursor the page starts after the id it encodes (keyset pagination),
+    so deep pages cost the same as the first. Without one the legacy skip/limit
+    offset is used. Either way, a full page sets the X-Next-Cursor header to
+    the cursor for the following page. Ids are assigned in insertion order, so
+    this is also created_at order.
+    """
+    query = query.order_by(model.id)
+    if cursor is not None:
+        last_id = decode_cursor(cursor)
+        if last_id is not None:
+            query = query.filter(model.id > last_id)
+    else:
+        query = query.offset(skip)
+    
+    items = query.limit(limit).all()
+    if items and len(items) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(items[-1].id)
+    return items
@@ -1,15 +1,22 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models import Product as ProductModel
+from app.api.pagination import paginate
 from app.api.schemas import Product, ProductCreate, ProductUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Product])
-def get_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    products = db.query(ProductModel).offset(skip).limit(limit).all()
+def get_products(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    products = paginate(db.query(ProductModel), ProductModel, response, skip, limit, cursor)
     return products
 
 @router.get("/{product_id}", response_model=Product)
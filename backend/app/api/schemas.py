@@ -1,6 +1,7 @@
+import json
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, EmailStr
+from typing import Dict, Literal, Optional, List
+from pydantic import BaseModel, EmailStr, Field, field_validator
 
 # Client schemas
 class ClientBase(BaseModel):
@@ -64,6 +65,9 @@ class DriverBase(BaseModel):
     capacity: float
     availability: bool = True
     current_location: str
+    # Left empty, they're geocoded from current_location in the background
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     rating: float = 5.0
 
 class DriverCreate(DriverBase):
@@ -78,6 +82,8 @@ class DriverUpdate(BaseModel):
     capacity: Optional[float] = None
     availability: Optional[bool] = None
     current_location: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     rating: Optional[float] = None
 
 class Driver(DriverBase):
@@ -87,6 +93,15 @@ class Driver(DriverBase):
     class Config:
         from_attributes = True
 
+class RankedDriver(Driver):
+    rank: int
+    active_shipments: Optional[int] = None
+    at_origin: Optional[bool] = None
+    distance_km: Optional[float] = None
+
+class NearbyDriver(Driver):
+    distance_km: float
+
 # Transporter schemas
 class TransporterBase(BaseModel):
     name: str
@@ -115,6 +130,14 @@ class Transporter(TransporterBase):
     id: int
     created_at: datetime
     
+    @field_validator("vehicle_types", mode="before")
+    @classmethod
+    def parse_vehicle_types(cls, value):
+        # Stored as a JSON string on the model, e.g. when nested in a shipment
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+    
     class Config:
         from_attributes = True
 
@@ -128,6 +151,8 @@ class ShipmentBase(BaseModel):
     destination: str
     estimated_eta: datetime
     status: str = "pending"
+    transport_mode: str = "road"
+    priority: str = "standard"
     confidence_score: float = 0.0
     weather_delay_factor: float = 1.0
     route_distance: float = 0.0
@@ -146,6 +171,8 @@ class ShipmentUpdate(BaseModel):
     estimated_eta: Optional[datetime] = None
     actual_eta: Optional[datetime] = None
     status: Optional[str] = None
+    transport_mode: Optional[str] = None
+    priority: Optional[str] = None
     confidence_score: Optional[float] = None
     weather_delay_factor: Optional[float] = None
     route_distance: Optional[float] = None
@@ -169,6 +196,33 @@ class ETARequest(BaseModel):
     origin: str
     destination: str
 
+class ETABatchRequest(BaseModel):
+    items: List[ETARequest]
+
+class InvoiceBatchRequest(BaseModel):
+    shipment_ids: List[int]
+    format: Literal["zip", "pdf"] = "zip"  # zip of one PDF per shipment, or one merged PDF
+
+class DispatchRequest(BaseModel):
+    shipment_ids: Optional[List[int]] = None  # every pending shipment by default
+    max_per_driver: int = Field(1, ge=1, le=50)
+    apply: bool = False  # write the assignments to the shipments
+
+class DispatchAssignment(BaseModel):
+    shipment_id: int
+    driver_id: int
+    cost: float
+    distance_km: float
+
+class DispatchPlanResponse(BaseModel):
+    assignments: List[DispatchAssignment]
+    unassigned: List[int]
+    total_cost: float
+    solver: str
+    drivers_considered: int
+    solve_ms: float
+    applied: bool = False
+
 class ETAResponse(BaseModel):
     estimated_eta: Optional[datetime] = None
     predicted_eta: Optional[str] = None
@@ -188,3 +242,22 @@ class UploadResponse(BaseModel):
     success: bool
     message: str
     count: int
+    rows_processed: int = 0
+    chunks: int = 0
+    # Rows left out of the import, counted by reason
+    skipped: Dict[str, int] = {}
+    job_id: Optional[str] = None
+
+class ImportJobResponse(BaseModel):
+    id: str
+    entity: str
+    format: str
+    status: str
+    chunks: int
+    rows_processed: int
+    created: int
+    skipped: Dict[str, int]
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
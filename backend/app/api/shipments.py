@@ -1,28 +1,90 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+import asyncio
+from typing import List, Optional, Set
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.core.database import get_db
-from app.models import Shipment as ShipmentModel, Driver as DriverModel, Product as ProductModel
-from app.api.schemas import Shipment, ShipmentCreate, ShipmentUpdate, ETARequest, ETAResponse, Driver
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core.database import get_async_db, get_db
+from app.models import Shipment as ShipmentModel, Product as ProductModel
+from app.api.pagination import paginate
+from app.api.schemas import (
+    Shipment, ShipmentCreate, ShipmentUpdate, ETARequest, ETABatchRequest, ETAResponse, Driver, InvoiceBatchRequest,
+    RankedDriver, DispatchRequest, DispatchPlanResponse
+)
+from app.core.config import settings
+from app.services.dispatch import apply_plan, load_problem, problem_addresses, solve as solve_dispatch
+from app.services.driver_selection import nearest_drivers, rank_drivers
 from app.services.eta_service import eta_service
-from io import BytesIO
+from app.services.invoices import PDF_AVAILABLE, invoice_renderer, invoice_rows, zip_invoices
 import json
 
 router = APIRouter()
 
-@router.get("/", response_model=List[Shipment])
-def get_shipments(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    shipments = db.query(ShipmentModel).offset(skip).limit(limit).all()
+SHIPMENT_RELATIONS = {
+    "client": ShipmentModel.client,
+    "product": ShipmentModel.product,
+    "driver": ShipmentModel.driver,
+    "transporter": ShipmentModel.transporter,
+}
+
+def _included_relations(include: Optional[str]) -> Set[str]:
+    """The relations named in `include`, all by default"""
+    if include is None:
+        names = set(SHIPMENT_RELATIONS)
+    else:
+        names = {name.strip() for name in include.split(",") if name.strip()}
+    
+    unknown = names - SHIPMENT_RELATIONS.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown relations: {', '.join(sorted(unknown))}. Valid: {', '.join(SHIPMENT_RELATIONS)}"
+        )
+    return names
+
+def _shipment_load_options(names: Set[str]) -> list:
+    """Bulk-load the named relations; loading any other one raises instead of querying"""
+    return [
+        selectinload(relation) if name in names else raiseload(relation, sql_only=True)
+        for name, relation in SHIPMENT_RELATIONS.items()
+    ]
+
+def _clear_excluded_relations(shipments: list, names: Set[str]) -> list:
+    """Set the relations left out of `names` to None without loading them, so they serialize as null"""
+    for shipment in shipments:
+        for name in SHIPMENT_RELATIONS.keys() - names:
+            set_committed_value(shipment, name, None)
     return shipments
 
+@router.get("/", response_model=List[Shipment])
+def get_shipments(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    names = _included_relations(include)
+    query = db.query(ShipmentModel).options(*_shipment_load_options(names))
+    shipments = paginate(query, ShipmentModel, response, skip, limit, cursor)
+    return _clear_excluded_relations(shipments, names)
+
 @router.get("/{shipment_id}", response_model=Shipment)
-def get_shipment(shipment_id: int, db: Session = Depends(get_db)):
-    shipment = db.query(ShipmentModel).filter(ShipmentModel.id == shipment_id).first()
+def get_shipment(shipment_id: int, include: Optional[str] = None, db: Session = Depends(get_db)):
+    names = _included_relations(include)
+    shipment = (
+        db.query(ShipmentModel)
+        .options(*_shipment_load_options(names))
+        .filter(ShipmentModel.id == shipment_id)
+        .first()
+    )
     if shipment is None:
         raise HTTPException(status_code=404, detail="Shipment not found")
-    return shipment
+    return _clear_excluded_relations([shipment], names)[0]
 
 @router.post("/", response_model=Shipment, status_code=status.HTTP_201_CREATED)
 def create_shipment(shipment: ShipmentCreate, db: Session = Depends(get_db)):
@@ -65,134 +127,216 @@ async def calculate_eta(eta_request: ETARequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to calculate ETA: {str(e)}")
 
-@router.post("/optimal-driver", response_model=Driver)
-def get_optimal_driver(
-    shipment_data: dict,
-    db: Session = Depends(get_db)
-):
-    """Get the optimal driver for a shipment based on availability, capacity, and rating"""
+@router.post("/calculate-eta/batch")
+async def calculate_eta_batch(batch: ETABatchRequest):
+    """Calculate ETAs for many routes, streaming one NDJSON line per item as lanes finish"""
+    if len(batch.items) > settings.eta_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch is limited to {settings.eta_batch_max_items} items"
+        )
+    
+    pairs = [(item.origin, item.destination) for item in batch.items]
+    
+    async def stream_results():
+        async for indices, eta_data in eta_service.calculate_eta_batch(pairs):
+            try:
+                if isinstance(eta_data, Exception):
+                    raise eta_data
+                payload = {"result": ETAResponse(**eta_data).model_dump(mode="json")}
+            except Exception as e:
+                payload = {"error": f"Failed to calculate ETA: {str(e)}"}
+            
+            for index in indices:
+                origin, destination = pairs[index]
+                yield json.dumps({"index": index, "origin": origin, "destination": destination, **payload}) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@router.get("/eta-cache/stats")
+def get_eta_cache_stats():
+    """Get hit/miss counters for the ETA service caches"""
+    return eta_service.cache_stats()
+
+@router.post("/eta-cache/warm")
+async def warm_eta_cache():
+    """Prefetch routes for every origin/destination pair already in the shipments table"""
+    return await eta_service.warm_route_cache()
+
+def _rank_for_shipment(db: Session, shipment_data: dict, k: int, balance_load: bool, near: Optional[tuple] = None):
+    # Get product weight to determine capacity requirements
+    product_id = shipment_data.get("product_id")
+    if not product_id:
+        raise HTTPException(status_code=400, detail="Product ID is required")
+    
+    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
     try:
-        # Get product weight to determine capacity requirements
-        product_id = shipment_data.get("product_id")
-        if not product_id:
-            raise HTTPException(status_code=400, detail="Product ID is required")
-        
-        product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
-        if not product:
-            raise HTTPException(status_code=404, detail="Product not found")
-        
-        # Find available drivers with sufficient capacity
-        available_drivers = db.query(DriverModel).filter(
-            and_(
-                DriverModel.availability == True,
-                DriverModel.capacity >= product.weight
+        if near is not None:
+            candidates = nearest_drivers(db, product.weight, near, k=k)
+        else:
+            candidates = rank_drivers(
+                db, product.weight, k=k, origin=shipment_data.get("origin"), balance_load=balance_load
             )
-        ).all()
-        
-        if not available_drivers:
-            raise HTTPException(status_code=404, detail="No available drivers with sufficient capacity")
-        
-        # Sort by rating (highest first) and return the best driver
-        optimal_driver = max(available_drivers, key=lambda d: d.rating)
-        return optimal_driver
-        
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to find optimal driver: {str(e)}")
+    
+    if not candidates:
+        raise HTTPException(status_code=404, detail="No available drivers with sufficient capacity")
+    return candidates
+
+async def _origin_coordinates(shipment_data: dict, nearest: bool) -> Optional[tuple]:
+    if not nearest:
+        return None
+    origin = shipment_data.get("origin")
+    if not origin:
+        raise HTTPException(status_code=400, detail="Origin is required to rank drivers by distance")
+    coords = await eta_service._geocode_address(origin)
+    if coords is None:
+        raise HTTPException(status_code=404, detail="Could not geocode origin")
+    return coords
+
+@router.post("/optimal-driver", response_model=Driver)
+async def get_optimal_driver(
+    shipment_data: dict,
+    balance_load: bool = True,
+    nearest: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the optimal driver for a shipment based on availability, capacity, and rating (or distance with nearest=true)"""
+    near = await _origin_coordinates(shipment_data, nearest)
+    candidates = await db.run_sync(_rank_for_shipment, shipment_data, 1, balance_load, near)
+    return candidates[0].driver
+
+@router.post("/optimal-drivers", response_model=List[RankedDriver])
+async def get_optimal_drivers(
+    shipment_data: dict,
+    k: int = Query(5, ge=1, le=100),
+    balance_load: bool = True,
+    nearest: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Top-k drivers for a shipment; rating ties go to drivers at the origin, then the least loaded.
+    
+    With nearest=true they're the k closest capable drivers to the geocoded origin instead.
+    """
+    near = await _origin_coordinates(shipment_data, nearest)
+    candidates = await db.run_sync(_rank_for_shipment, shipment_data, k, balance_load, near)
+    return [
+        RankedDriver(
+            **Driver.model_validate(candidate.driver).model_dump(),
+            rank=rank,
+            active_shipments=candidate.active_shipments,
+            at_origin=candidate.at_origin,
+            distance_km=candidate.distance_km
+        )
+        for rank, candidate in enumerate(candidates, start=1)
+    ]
+
+@router.post("/dispatch", response_model=DispatchPlanResponse)
+async def dispatch_shipments(request: DispatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """Assign many shipments to available drivers in one global solve"""
+    if request.shipment_ids is not None and len(request.shipment_ids) > settings.dispatch_max_shipments:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Dispatch is limited to {settings.dispatch_max_shipments} shipments"
+        )
+    
+    problem = await db.run_sync(load_problem, request.shipment_ids)
+    if request.shipment_ids is not None:
+        missing = sorted(set(request.shipment_ids) - set(problem.shipment_ids.tolist()))
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Shipments not found: {', '.join(map(str, missing))}")
+    elif len(problem.shipment_ids) > settings.dispatch_max_shipments:
+        raise HTTPException(
+            status_code=413,
+            detail=f"{len(problem.shipment_ids)} pending shipments; dispatch is limited to {settings.dispatch_max_shipments}"
+        )
+    
+    addresses = problem_addresses(problem)
+    coords = dict(zip(addresses, await asyncio.gather(
+        *(eta_service._geocode_address(address) for address in addresses.values())
+    )))
+    
+    plan = await run_in_threadpool(solve_dispatch, problem, coords, request.max_per_driver)
+    if request.apply:
+        await db.run_sync(apply_plan, plan)
+    return DispatchPlanResponse(**plan._asdict(), applied=request.apply)
+
+async def _invoice_rows(db: AsyncSession, shipment_ids: List[int]) -> dict:
+    """Invoice rows keyed by shipment id, built here so only plain data crosses to the render workers"""
+    shipments = await db.scalars(
+        select(ShipmentModel)
+        .options(*_shipment_load_options({"client", "product", "driver"}))
+        .where(ShipmentModel.id.in_(shipment_ids))
+    )
+    return {shipment.id: invoice_rows(shipment) for shipment in shipments}
 
 @router.get("/{shipment_id}/invoice")
-def generate_invoice(shipment_id: int, db: Session = Depends(get_db)):
+async def generate_invoice(shipment_id: int, db: AsyncSession = Depends(get_async_db)):
     """Generate PDF invoice for a shipment"""
-    shipment = db.query(ShipmentModel).filter(ShipmentModel.id == shipment_id).first()
-    if shipment is None:
+    rows = (await _invoice_rows(db, [shipment_id])).get(shipment_id)
+    if rows is None:
         raise HTTPException(status_code=404, detail="Shipment not found")
     
-    try:
-        from reportlab.lib.pagesizes import letter
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib import colors
-        
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30,
-            alignment=1  # Center
+    if not PDF_AVAILABLE:
+        return {"message": "PDF generation not available. Install reportlab package."}
+    
+    pdf = await invoice_renderer.render(rows)
+    return Response(
+        content=pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename=invoice_{shipment_id}.pdf"}
+    )
+
+@router.post("/invoices/batch")
+async def generate_invoice_batch(batch: InvoiceBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """Render invoices for many shipments in parallel, as a zip of PDFs or one merged PDF"""
+    shipment_ids = list(dict.fromkeys(batch.shipment_ids))
+    if not shipment_ids:
+        raise HTTPException(status_code=400, detail="No shipment IDs given")
+    if len(shipment_ids) > settings.invoice_batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch is limited to {settings.invoice_batch_max_items} invoices"
         )
-        story.append(Paragraph("SHIPMENT INVOICE", title_style))
-        story.append(Spacer(1, 12))
-        
-        # Shipment details
-        data = [
-            ['Shipment ID:', str(shipment.id)],
-            ['Origin:', shipment.origin],
-            ['Destination:', shipment.destination],
-            ['Status:', shipment.status.upper()],
-            ['Estimated ETA:', shipment.estimated_eta.strftime('%Y-%m-%d %H:%M')],
-            ['Distance:', f"{shipment.route_distance/1000:.1f} km"],
-            ['Confidence Score:', f"{shipment.confidence_score*100:.1f}%"],
-        ]
-        
-        if shipment.client:
-            data.extend([
-                ['Client Name:', shipment.client.name],
-                ['Client Email:', shipment.client.email],
-            ])
-        
-        if shipment.product:
-            data.extend([
-                ['Product:', shipment.product.name],
-                ['Category:', shipment.product.category],
-                ['Weight:', f"{shipment.product.weight} kg"],
-                ['Value:', f"${shipment.product.value:.2f}"],
-            ])
-        
-        if shipment.driver:
-            data.extend([
-                ['Driver:', shipment.driver.name],
-                ['Driver Phone:', shipment.driver.phone],
-                ['Vehicle Type:', shipment.driver.vehicle_type],
-            ])
-        
-        table = Table(data, colWidths=[2*inch, 4*inch])
-        table.setStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.grey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (1, 0), (1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ])
-        
-        story.append(table)
-        doc.build(story)
-        
-        buffer.seek(0)
-        return StreamingResponse(
-            BytesIO(buffer.read()),
+    
+    rows = await _invoice_rows(db, shipment_ids)
+    missing = [shipment_id for shipment_id in shipment_ids if shipment_id not in rows]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Shipments not found: {', '.join(map(str, missing))}")
+    
+    if not PDF_AVAILABLE:
+        return {"message": "PDF generation not available. Install reportlab package."}
+    
+    invoices = [rows[shipment_id] for shipment_id in shipment_ids]
+    if batch.format == "pdf":
+        return Response(
+            content=await invoice_renderer.render_merged(invoices),
             media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename=invoice_{shipment_id}.pdf"}
+            headers={"Content-Disposition": "attachment; filename=invoices.pdf"}
         )
-        
-    except ImportError:
-        # Fallback if reportlab is not available
-        return {"message": "PDF generation not available. Install reportlab package."}
+    
+    documents = await invoice_renderer.render_many(invoices)
+    archive = await asyncio.to_thread(
+        zip_invoices, [(f"invoice_{shipment_id}.pdf", document) for shipment_id, document in zip(shipment_ids, documents)]
+    )
+    return Response(
+        content=archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=invoices.zip"}
+    )
 
 @router.post("/{shipment_id}/predict-eta", response_model=ETAResponse)
-async def predict_shipment_eta(shipment_id: int, db: Session = Depends(get_db)):
+async def predict_shipment_eta(shipment_id: int, db: AsyncSession = Depends(get_async_db)):
     """Predict ETA for a specific shipment using AI"""
     try:
         # Get shipment details
-        shipment = db.query(ShipmentModel).filter(ShipmentModel.id == shipment_id).first()
+        shipment = await db.scalar(
+            select(ShipmentModel).options(selectinload(ShipmentModel.product)).where(ShipmentModel.id == shipment_id)
+        )
         if not shipment:
             raise HTTPException(status_code=404, detail="Shipment not found")
         
@@ -202,8 +346,7 @@ async def predict_shipment_eta(shipment_id: int, db: Session = Depends(get_db)):
             destination=shipment.destination,
             shipment_data={
                 "id": shipment.id,
-                "weight": shipment.weight,
-                "volume": shipment.volume,
+                "weight": shipment.product.weight if shipment.product else 0,
                 "priority": shipment.priority,
                 "transport_mode": shipment.transport_mode
             }
@@ -212,7 +355,7 @@ async def predict_shipment_eta(shipment_id: int, db: Session = Depends(get_db)):
         # Update shipment with predicted ETA
         shipment.predicted_eta = eta_data.get("predicted_eta")
         shipment.ai_confidence = eta_data.get("confidence", 85.0)
-        db.commit()
+        await db.commit()
         
         return ETAResponse(
             shipment_id=shipment_id,
@@ -225,6 +368,8 @@ async def predict_shipment_eta(shipment_id: int, db: Session = Depends(get_db)):
                 "Track carrier performance"
             ])
         )
-        
+    
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to predict ETA: {str(e)}")
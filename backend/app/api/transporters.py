@@ -1,16 +1,23 @@
 import json
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models import Transporter as TransporterModel
+from app.api.pagination import paginate
 from app.api.schemas import Transporter, TransporterCreate, TransporterUpdate
 
 router = APIRouter()
 
 @router.get("/", response_model=List[Transporter])
-def get_transporters(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    transporters = db.query(TransporterModel).offset(skip).limit(limit).all()
+def get_transporters(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    transporters = paginate(db.query(TransporterModel), TransporterModel, response, skip, limit, cursor)
     # Convert vehicle_types from JSON string to list
     for transporter in transporters:
         if transporter.vehicle_types:
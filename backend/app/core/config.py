@@ -8,8 +8,102 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here-change-in-production"
     openrouteservice_api_key: str = ""
     openweather_api_key: str = ""
+    openrouteservice_url: str = "https://api.openrouteservice.org/v2"
+    openweather_url: str = "https://api.openweathermap.org/data/2.5"
     cors_origins: list = ["http://localhost:5173", "http://localhost:3000"]
     
+    # Database connection pool (not used for in-memory SQLite)
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0  # seconds to wait for a free connection
+    db_pool_recycle: int = 3600  # seconds; -1 never recycles
+    db_pool_pre_ping: bool = True
+    
+    # Pragmas applied to every SQLite connection
+    sqlite_journal_mode: str = "WAL"  # readers don't block the writer, or each other
+    sqlite_synchronous: str = "NORMAL"  # fsync at checkpoints only; safe with WAL
+    sqlite_busy_timeout: int = 5000  # ms to wait on a locked database before failing
+    sqlite_cache_size: int = -65536  # pages, or KiB when negative (64 MiB)
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # bytes; 0 disables memory-mapped reads
+    sqlite_temp_store: str = "MEMORY"
+    
+    # CSV uploads are read and committed in chunks of this many rows
+    upload_chunk_size: int = 10000
+    
+    # Background import jobs run on a thread pool, off the event loop
+    import_workers: int = 2
+    import_job_history: int = 100  # finished jobs kept for status polling
+    
+    # Exports read the database in batches of this many rows (one Parquet row group each)
+    export_batch_size: int = 50000
+    
+    # Lane rollups for /analytics/routes, refreshed in the background for lanes with changed shipments
+    lane_rollup_interval: float = 5.0  # seconds
+    lane_rollup_batch_size: int = 200  # lanes recomputed per query
+    
+    # Shared cache for polled GET endpoints, invalidated by committed writes (see response_cache.CACHE_RULES)
+    response_cache_enabled: bool = True
+    response_cache_size: int = 1000
+    
+    # PDF invoices render on a process pool; batches are split into chunks of this many invoices per task
+    invoice_workers: int = 2
+    invoice_batch_max_items: int = 500
+    invoice_batch_chunk_size: int = 25
+    
+    # Batch dispatch: cost = rating_weight * (5 - rating) / 4 + distance_weight * km / distance_scale_km
+    dispatch_rating_weight: float = 1.0
+    dispatch_distance_weight: float = 1.0
+    dispatch_distance_scale_km: float = 100.0
+    dispatch_unknown_distance_km: float = 500.0  # for locations that couldn't be geocoded
+    dispatch_max_shipments: int = 5000
+    dispatch_max_matrix_cells: int = 10_000_000  # above this, only each shipment's cheapest drivers are kept (approximate)
+    dispatch_candidates_per_shipment: int = 10
+    
+    # In-memory grid of geocoded driver positions for nearest-driver queries
+    driver_grid_cell_degrees: float = 0.25  # ~28km cells at the equator
+    driver_geocode_batch_size: int = 1000
+    
+    # Shared HTTP client used for all external API calls
+    http2_enabled: bool = True
+    http_timeout: float = 10.0  # seconds
+    http_connect_timeout: float = 5.0  # seconds
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0  # seconds
+    http_max_connections_per_host: int = 20
+    
+    # Geocode cache (in-memory LRU backed by the geocode_cache table)
+    geocode_cache_size: int = 10000
+    geocode_cache_ttl: float = 30 * 24 * 3600  # seconds
+    geocode_negative_ttl: float = 3600  # seconds, for addresses with no match
+    
+    # Route cache keyed by (origin, destination, profile), backed by the route_cache table
+    route_cache_size: int = 50000
+    route_cache_ttl: float = 7 * 24 * 3600  # seconds
+    route_cache_warm_on_startup: bool = False
+    route_cache_warm_concurrency: int = 10
+    
+    # OpenRouteService matrix API, used to fill the route cache for many lanes at once
+    ors_matrix_enabled: bool = True
+    ors_matrix_max_locations: int = 50  # sources + destinations per request
+    ors_matrix_max_elements: int = 2500  # sources x destinations per request
+    
+    # Weather cache bucketed by rounded lat/lon cell and time window
+    weather_cache_size: int = 10000
+    weather_cell_precision: int = 1  # decimal places, ~11km cells
+    weather_bucket_seconds: int = 3600
+    weather_stale_seconds: int = 900  # serve stale while refreshing
+    
+    # AI prediction pipeline; bump the version or seed to invalidate cached predictions
+    ai_model_version: str = "1.0.0"
+    ai_factor_seed: int = 0
+    prediction_cache_size: int = 10000
+    prediction_cache_ttl: float = 3600  # seconds
+    
+    # Batch ETA calculation
+    eta_batch_max_items: int = 10000
+    eta_batch_concurrency: int = 50
+    
     class Config:
         env_file = ".env"
 
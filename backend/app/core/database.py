@@ -1,15 +1,114 @@
-from sqlalchemy import create_engine
+from typing import Dict
+from sqlalchemy import Table, create_engine, event, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+# Accepted values for the string pragmas, which can't be bound as parameters
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+
+def _choice(name: str, value: str, allowed: set) -> str:
+    value = value.upper()
+    if value not in allowed:
+        raise ValueError(f"{name} must be one of {', '.join(sorted(allowed))}, got {value!r}")
+    return value
+
+def sqlite_pragmas() -> list:
+    """PRAGMA statements run on every new SQLite connection"""
+    return [
+        f"PRAGMA journal_mode={_choice('sqlite_journal_mode', settings.sqlite_journal_mode, _JOURNAL_MODES)}",
+        f"PRAGMA synchronous={_choice('sqlite_synchronous', settings.sqlite_synchronous, _SYNCHRONOUS)}",
+        f"PRAGMA temp_store={_choice('sqlite_temp_store', settings.sqlite_temp_store, _TEMP_STORES)}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+    ]
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def _pool_options() -> dict:
+    return dict(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping
+    )
+
+def _engine_options(url: str) -> dict:
+    if not url.startswith("sqlite"):
+        return _pool_options()
+    # In-memory databases keep SQLAlchemy's single-connection pool
+    options = {} if _is_memory_sqlite(url) else _pool_options()
+    options["connect_args"] = {"check_same_thread": False, "timeout": settings.sqlite_busy_timeout / 1000}
+    return options
+
+def _add_sqlite_pragmas(sqlite_engine: Engine) -> None:
+    pragmas = sqlite_pragmas()
+    
+    @event.listens_for(sqlite_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+def create_db_engine(url: str) -> Engine:
+    """Engine for `url` with the pool and, for SQLite, the pragma profile from settings"""
+    db_engine = create_engine(url, **_engine_options(url))
+    if url.startswith("sqlite"):
+        _add_sqlite_pragmas(db_engine)
+    return db_engine
+
+# Async drivers for the sync URLs in settings; anything else must name its async driver itself
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """`url` with its driver swapped for the asyncio one, e.g. sqlite:// -> sqlite+aiosqlite://"""
+    scheme, separator, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+def create_async_db_engine(url: str) -> AsyncEngine:
+    """Async counterpart of `create_db_engine`, with the same pool and SQLite pragmas"""
+    async_url = async_database_url(url)
+    db_engine = create_async_engine(async_url, **_engine_options(url))
+    if url.startswith("sqlite"):
+        # aiosqlite connections expose the sqlite3 cursor API, so the sync listener applies unchanged
+        _add_sqlite_pragmas(db_engine.sync_engine)
+    return db_engine
+
+def ensure_columns(db_engine: Engine, table: Table, columns: Dict[str, str]) -> None:
+    """Add `columns` (name -> column DDL) to a table created before they existed, then any indexes it lacks"""
+    existing = {column["name"] for column in inspect(db_engine).get_columns(table.name)}
+    with db_engine.begin() as connection:
+        for name, ddl in columns.items():
+            if name not in existing:
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {name} {ddl}"))
+        # create_all only builds indexes together with their table
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+engine = create_db_engine(settings.database_url)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async handlers use this so queries wait on the driver's thread instead of blocking the event loop.
+# Objects stay readable after commit; there is no implicit IO to refresh them under asyncio.
+async_engine = create_async_db_engine(settings.database_url)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -18,3 +117,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
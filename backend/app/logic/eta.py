@@ -0,0 +1,117 @@
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional
+from numpy.typing import ArrayLike
+
+# Shared with the scalar path in ETAService
+TRAFFIC_BUFFER = 0.15
+BASE_CONFIDENCE = 0.8
+HEAVY_CARGO_KG = 1000
+
+# Confidence added by route distance: (upper bound in metres, factor), nearest first
+DISTANCE_FACTORS = ((10000, 0.1), (50000, 0.05))
+LONG_DISTANCE_FACTOR = -0.1
+WEATHER_CONFIDENCE = 0.1
+WEATHER_DELAY_PENALTY = 0.5
+GEOMETRY_FACTOR = 0.1
+NO_GEOMETRY_FACTOR = -0.05
+MIN_CONFIDENCE = 0.1
+MAX_CONFIDENCE = 1.0
+
+# Confidence adjustments made by the AI prediction
+HEAVY_CARGO_ADJUSTMENT = -0.05
+PRIORITY_ADJUSTMENTS = {"urgent": 0.1, "low": -0.05}
+TRANSPORT_MODE_ADJUSTMENTS = {"air": 0.15, "sea": -0.1}
+MAX_AI_CONFIDENCE = 0.99
+
+def confidence_scores(distance: ArrayLike, weather_factor: ArrayLike, has_geometry: ArrayLike) -> np.ndarray:
+    """Vectorized ETAService._calculate_confidence_score"""
+    distance = np.asarray(distance, dtype=np.float64)
+    weather_factor = np.asarray(weather_factor, dtype=np.float64)
+    has_geometry = np.asarray(has_geometry, dtype=bool)
+    
+    # Distance factor - shorter distances are more predictable
+    distance_factor = np.select(
+        [distance < limit for limit, _ in DISTANCE_FACTORS],
+        [factor for _, factor in DISTANCE_FACTORS],
+        LONG_DISTANCE_FACTOR
+    )
+    
+    # Weather factor - worse weather reduces confidence
+    weather_confidence = np.maximum(0, WEATHER_CONFIDENCE - (weather_factor - 1.0) * WEATHER_DELAY_PENALTY)
+    
+    # Route geometry factor - having actual route data increases confidence
+    geometry_factor = np.where(has_geometry, GEOMETRY_FACTOR, NO_GEOMETRY_FACTOR)
+    
+    final_confidence = BASE_CONFIDENCE + distance_factor + weather_confidence + geometry_factor
+    return np.clip(final_confidence, MIN_CONFIDENCE, MAX_CONFIDENCE)
+
+def ai_adjustments(
+    size: int,
+    weight: Optional[ArrayLike] = None,
+    priority: Optional[ArrayLike] = None,
+    transport_mode: Optional[ArrayLike] = None
+):
+    """Vectorized confidence adjustment and risk level from ETAService.predict_eta_with_ai"""
+    weight = np.zeros(size) if weight is None else np.asarray(weight, dtype=np.float64)
+    priority = np.full(size, "standard") if priority is None else np.asarray(priority)
+    transport_mode = np.full(size, "road") if transport_mode is None else np.asarray(transport_mode)
+    
+    heavy = weight > HEAVY_CARGO_KG
+    adjustment = np.zeros(size)
+    adjustment += np.where(heavy, HEAVY_CARGO_ADJUSTMENT, 0.0)
+    adjustment += np.select([priority == value for value in PRIORITY_ADJUSTMENTS], list(PRIORITY_ADJUSTMENTS.values()), 0.0)
+    adjustment += np.select(
+        [transport_mode == value for value in TRANSPORT_MODE_ADJUSTMENTS], list(TRANSPORT_MODE_ADJUSTMENTS.values()), 0.0
+    )
+    
+    # heavy_cargo is currently the only risk factor the AI path can raise
+    risk_level = np.where(heavy, "medium", "low").astype(object)
+    return adjustment, risk_level
+
+def score_etas(
+    distance: ArrayLike,
+    duration: ArrayLike,
+    weather_factor: ArrayLike,
+    has_geometry: ArrayLike = True,
+    weight: Optional[ArrayLike] = None,
+    priority: Optional[ArrayLike] = None,
+    transport_mode: Optional[ArrayLike] = None,
+    now: Optional[datetime] = None
+) -> Dict[str, np.ndarray]:
+    """Score a whole fleet of routes in one pass.
+    
+    Takes equal-length arrays (scalars broadcast) and returns arrays matching
+    calculate_eta and predict_eta_with_ai: final duration in seconds, ETA,
+    base confidence, AI confidence as a percentage, and risk level.
+    """
+    distance, duration, weather_factor, has_geometry = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(distance, dtype=np.float64)),
+        np.atleast_1d(np.asarray(duration, dtype=np.float64)),
+        np.atleast_1d(np.asarray(weather_factor, dtype=np.float64)),
+        np.atleast_1d(np.asarray(has_geometry, dtype=bool))
+    )
+    size = distance.shape[0]
+    
+    final_duration = duration * weather_factor * (1 + TRAFFIC_BUFFER)
+    now = np.datetime64(now or datetime.now(), "us")
+    # Split whole and fractional seconds before rounding, as datetime.timedelta does
+    whole_seconds = np.floor(final_duration)
+    microseconds = np.rint((final_duration - whole_seconds) * 1e6)
+    estimated_eta = (
+        now
+        + whole_seconds.astype("timedelta64[s]")
+        + microseconds.astype("timedelta64[us]")
+    )
+    
+    confidence = confidence_scores(distance, weather_factor, has_geometry)
+    adjustment, risk_level = ai_adjustments(size, weight, priority, transport_mode)
+    ai_confidence = np.round(np.clip(confidence + adjustment, MIN_CONFIDENCE, MAX_AI_CONFIDENCE) * 100, 1)
+    
+    return {
+        "final_duration": final_duration,
+        "estimated_eta": estimated_eta,
+        "confidence_score": confidence,
+        "ai_confidence": ai_confidence,
+        "risk_level": risk_level
+    }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -44,11 +44,18 @@ class Driver(Base):
     capacity = Column(Float, nullable=False)  # in kg
     availability = Column(Boolean, default=True)
     current_location = Column(String, nullable=False)
+    latitude = Column(Float, nullable=True)  # geocoded from current_location
+    longitude = Column(Float, nullable=True)
     rating = Column(Float, default=5.0)  # 1.0 to 5.0
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     shipments = relationship("Shipment", back_populates="driver")
+    
+    __table_args__ = (
+        # Optimal-driver selection: equality on availability, range on capacity, rating read from the index
+        Index("ix_drivers_dispatch", "availability", "capacity", "rating"),
+    )
 
 class Transporter(Base):
     __tablename__ = "transporters"
@@ -82,6 +89,8 @@ class Shipment(Base):
     actual_eta = Column(DateTime(timezone=True), nullable=True)
     
     status = Column(String, default="pending")  # pending, in_transit, delivered, delayed
+    transport_mode = Column(String, default="road")  # road, air, sea, rail
+    priority = Column(String, default="standard")  # low, standard, urgent
     confidence_score = Column(Float, default=0.0)  # 0.0 to 1.0
     weather_delay_factor = Column(Float, default=1.0)  # multiplier
     route_distance = Column(Float, default=0.0)  # in meters
@@ -95,3 +104,53 @@ class Shipment(Base):
     product = relationship("Product", back_populates="shipments")
     driver = relationship("Driver", back_populates="shipments")
     transporter = relationship("Transporter", back_populates="shipments")
+    
+    __table_args__ = (
+        Index("ix_shipments_lane", "origin", "destination", "transport_mode"),
+        Index("ix_shipments_driver_status", "driver_id", "status"),
+    )
+
+class GeocodeCacheEntry(Base):
+    __tablename__ = "geocode_cache"
+    
+    address_key = Column(String, primary_key=True)  # normalized address
+    longitude = Column(Float, nullable=True)  # NULL for addresses with no match
+    latitude = Column(Float, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+class RouteCacheEntry(Base):
+    __tablename__ = "route_cache"
+    
+    origin_key = Column(String, primary_key=True)  # normalized addresses
+    destination_key = Column(String, primary_key=True)
+    profile = Column(String, primary_key=True)  # e.g. driving-car
+    distance = Column(Float, nullable=False)  # in meters
+    duration = Column(Float, nullable=False)  # in seconds
+    geometry = Column(Text, nullable=True)  # JSON
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+class ShipmentDailyStat(Base):
+    __tablename__ = "shipment_daily_stats"
+    
+    day = Column(Date, primary_key=True)  # UTC date the shipment was created
+    status = Column(String, primary_key=True)
+    transport_mode = Column(String, primary_key=True)
+    shipment_count = Column(Integer, nullable=False, default=0)
+    delivered_timed_count = Column(Integer, nullable=False, default=0)  # delivered with an actual_eta
+    delivery_seconds = Column(Float, nullable=False, default=0.0)  # sum of actual_eta - created_at
+
+class LaneStat(Base):
+    __tablename__ = "lane_stats"
+    
+    origin = Column(String, primary_key=True)
+    destination = Column(String, primary_key=True)
+    transport_mode = Column(String, primary_key=True)
+    volume = Column(Integer, nullable=False, default=0, index=True)
+    completed_count = Column(Integer, nullable=False, default=0)  # shipments with an actual_eta
+    on_time_count = Column(Integer, nullable=False, default=0)  # actual_eta <= estimated_eta
+    on_time_percentage = Column(Float, nullable=True, index=True)  # NULL until a shipment completes
+    avg_distance = Column(Float, nullable=False, default=0.0, index=True)  # in meters
+    avg_duration = Column(Float, nullable=False, default=0.0, index=True)  # in seconds
+    total_cost = Column(Float, nullable=False, default=0.0, index=True)  # route km x transporter base_rate
+    avg_cost = Column(Float, nullable=False, default=0.0, index=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
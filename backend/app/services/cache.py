@@ -0,0 +1,177 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Sentinel for "not cached", so that None can be cached as a (negative) result
+MISSING = object()
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at")
+    
+    def __init__(self, value: Any, expires_at: float):
+        self.value = value
+        self.expires_at = expires_at
+
+class TTLCache:
+    """Bounded in-memory LRU cache whose entries expire after a time-to-live"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return the cached value, or `default` if it is absent or expired"""
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entries when full"""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = CacheEntry(value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def delete(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into a single in-flight task"""
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.collapsed = 0
+    
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.collapsed += 1
+        
+        # Shield the shared task so one cancelled caller doesn't cancel it for the others
+        return await asyncio.shield(task)
+
+class TieredCache:
+    """In-memory TTL/LRU tier in front of a persistent store, with single-flight loading.
+    
+    Subclasses implement `_read_persisted` and `_write_persisted` against their table.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float, session_factory):
+        self.session_factory = session_factory
+        self.memory = TTLCache(maxsize, ttl)
+        self._flight = SingleFlight()
+        self.persistent_hits = 0
+        self.persistent_misses = 0
+        self.upstream_calls = 0
+    
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for `key`, calling `fetch` on a miss in both tiers.
+        
+        Exceptions raised by `fetch` propagate to every waiting caller and are never cached.
+        """
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+        return await self._flight.do(key, lambda: self._load(key, fetch))
+    
+    async def lookup(self, key: Hashable) -> Any:
+        """Return the value from either tier without fetching, or MISSING"""
+        value = self.memory.get(key)
+        if value is not MISSING:
+            return value
+        
+        stored = await asyncio.to_thread(self._read_persisted, key)
+        if stored is MISSING:
+            return MISSING
+        value, ttl = stored
+        self.persistent_hits += 1
+        self.memory.set(key, value, ttl=min(ttl, self.memory.ttl))
+        return value
+    
+    async def put(self, key: Hashable, value: Any) -> None:
+        """Store a value fetched elsewhere in both tiers"""
+        ttl = self.ttl_for(value)
+        self.memory.set(key, value, ttl=ttl)
+        await asyncio.to_thread(self._write_persisted, key, value, ttl)
+    
+    async def refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Call `fetch` regardless of what either tier holds and store the result over it"""
+        return await self._flight.do(("refresh", key), lambda: self._fetch(key, fetch))
+    
+    async def _load(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        stored = await asyncio.to_thread(self._read_persisted, key)
+        if stored is not MISSING:
+            value, ttl = stored
+            self.persistent_hits += 1
+            self.memory.set(key, value, ttl=min(ttl, self.memory.ttl))
+            return value
+        
+        self.persistent_misses += 1
+        return await self._fetch(key, fetch)
+    
+    async def _fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        self.upstream_calls += 1
+        value = await fetch()
+        await self.put(key, value)
+        return value
+    
+    def ttl_for(self, value: Any) -> float:
+        return self.memory.ttl
+    
+    def _read_persisted(self, key: Hashable):
+        """Return (value, remaining ttl) from the persistent tier, or MISSING"""
+        return MISSING
+    
+    def _write_persisted(self, key: Hashable, value: Any, ttl: float) -> None:
+        pass
+    
+    @staticmethod
+    def _remaining_ttl(expires_at: datetime) -> float:
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return (expires_at - datetime.now(timezone.utc)).total_seconds()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory": self.memory.stats(),
+            "persistent_hits": self.persistent_hits,
+            "persistent_misses": self.persistent_misses,
+            "upstream_calls": self.upstream_calls,
+            "collapsed_requests": self._flight.collapsed
+        }
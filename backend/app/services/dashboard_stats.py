@@ -0,0 +1,192 @@
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import case, delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.database import ensure_columns
+from app.models import Shipment as ShipmentModel, ShipmentDailyStat
+from app.services.response_cache import mark_written
+
+logger = logging.getLogger(__name__)
+
+# Days covered by each dashboard timeframe, counting today
+TIMEFRAME_DAYS = {"7d": 7, "30d": 30, "90d": 90, "1y": 365}
+
+# Shipments in this status are counted as at risk
+AT_RISK_STATUS = "delayed"
+
+# Attributes that decide which aggregate row a shipment lands in, or what it adds to it
+_TRACKED_ATTRS = ("created_at", "status", "transport_mode", "actual_eta")
+
+StatKey = Tuple[date, str, str]
+
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _contribution(created_at: Optional[datetime], status: Optional[str], transport_mode: Optional[str], actual_eta: Optional[datetime]) -> Tuple[StatKey, Tuple[int, int, float]]:
+    """Which aggregate row a shipment belongs to, and its (count, timed deliveries, delivery seconds)"""
+    # created_at is a server default, so a row that was just inserted may not have it loaded yet
+    created_at = _utc_naive(created_at) or datetime.utcnow()
+    actual_eta = _utc_naive(actual_eta)
+    status = status or "pending"
+    key = (created_at.date(), status, transport_mode or "road")
+    
+    if status == "delivered" and actual_eta is not None:
+        return key, (1, 1, (actual_eta - created_at).total_seconds())
+    return key, (1, 0, 0.0)
+
+def _current_values(shipment: ShipmentModel) -> Dict[str, Any]:
+    return {attr: shipment.__dict__.get(attr) for attr in _TRACKED_ATTRS}
+
+def _previous_values(shipment: ShipmentModel) -> Dict[str, Any]:
+    """Tracked attributes as they were before this flush"""
+    state = inspect(shipment)
+    values = {}
+    for attr in _TRACKED_ATTRS:
+        history = state.attrs[attr].history
+        if history.deleted:
+            values[attr] = history.deleted[0]
+        elif history.unchanged:
+            values[attr] = history.unchanged[0]
+        else:
+            values[attr] = shipment.__dict__.get(attr)
+    return values
+
+def _add(deltas: Dict[StatKey, list], values: Dict[str, Any], sign: int) -> None:
+    key, (count, timed, seconds) = _contribution(**values)
+    delta = deltas[key]
+    delta[0] += sign * count
+    delta[1] += sign * timed
+    delta[2] += sign * seconds
+
+def apply_deltas(connection, deltas: Dict[StatKey, list]) -> None:
+    """Add per-key deltas to the aggregate table, creating rows that don't exist yet"""
+    table = ShipmentDailyStat.__table__
+    for (day, status, transport_mode), (count, timed, seconds) in deltas.items():
+        if not (count or timed or seconds):
+            continue
+        match = (table.c.day == day) & (table.c.status == status) & (table.c.transport_mode == transport_mode)
+        result = connection.execute(
+            update(table).where(match).values(
+                shipment_count=table.c.shipment_count + count,
+                delivered_timed_count=table.c.delivered_timed_count + timed,
+                delivery_seconds=table.c.delivery_seconds + seconds
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(
+                day=day,
+                status=status,
+                transport_mode=transport_mode,
+                shipment_count=count,
+                delivered_timed_count=timed,
+                delivery_seconds=seconds
+            ))
+
+@event.listens_for(Session, "before_flush")
+def _load_tracked_attrs(session: Session, flush_context, instances) -> None:
+    # Expired attributes have no history, so load them while the old row still exists
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ShipmentModel):
+            for attr in _TRACKED_ATTRS:
+                getattr(obj, attr)
+
+@event.listens_for(Session, "after_flush")
+def _maintain_daily_stats(session: Session, flush_context) -> None:
+    """Keep shipment_daily_stats in step with shipment inserts, updates and deletes, in the same transaction"""
+    deltas: Dict[StatKey, list] = defaultdict(lambda: [0, 0, 0.0])
+    
+    for obj in session.new:
+        if isinstance(obj, ShipmentModel):
+            _add(deltas, _current_values(obj), 1)
+    
+    for obj in session.dirty:
+        if isinstance(obj, ShipmentModel) and session.is_modified(obj):
+            previous = _previous_values(obj)
+            current = _current_values(obj)
+            if previous != current:
+                _add(deltas, previous, -1)
+                _add(deltas, current, 1)
+    
+    for obj in session.deleted:
+        if isinstance(obj, ShipmentModel):
+            _add(deltas, _previous_values(obj), -1)
+    
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+def rebuild_daily_stats(db: Session, batch_size: int = 50000) -> int:
+    """Recompute the aggregate table from shipments, e.g. after rows were written outside the ORM"""
+    deltas: Dict[StatKey, list] = defaultdict(lambda: [0, 0, 0.0])
+    columns = [getattr(ShipmentModel, attr) for attr in _TRACKED_ATTRS]
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(ShipmentModel.id, *columns)
+            .where(ShipmentModel.id > last_id)
+            .order_by(ShipmentModel.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            _add(deltas, dict(zip(_TRACKED_ATTRS, row[1:])), 1)
+        last_id = rows[-1][0]
+    
+    connection = db.connection()
+    connection.execute(delete(ShipmentDailyStat.__table__))
+    apply_deltas(connection, deltas)
+    mark_written(db, ShipmentDailyStat.__tablename__)
+    db.commit()
+    logger.info("Rebuilt shipment_daily_stats: %d rows", len(deltas))
+    return len(deltas)
+
+def ensure_shipment_columns(engine: Engine) -> None:
+    """Add the columns the aggregates read to shipments tables created before they existed"""
+    ensure_columns(engine, ShipmentModel.__table__, {
+        "transport_mode": "VARCHAR DEFAULT 'road'",
+        "priority": "VARCHAR DEFAULT 'standard'",
+    })
+
+def ensure_daily_stats(db: Session) -> None:
+    """Backfill the aggregate table once for databases that predate it"""
+    has_stats = db.execute(select(ShipmentDailyStat.day).limit(1)).first() is not None
+    has_shipments = db.execute(select(ShipmentModel.id).limit(1)).first() is not None
+    if has_shipments and not has_stats:
+        rebuild_daily_stats(db)
+
+def dashboard_summary(db: Session, timeframe: str) -> Dict[str, Any]:
+    """Shipment counts and average delivery time, read from the daily aggregates.
+    
+    Created and delivered volumes and the delivery time cover the timeframe; in_transit
+    and at_risk are current state, so they count shipments created at any time.
+    """
+    days = TIMEFRAME_DAYS.get(timeframe, TIMEFRAME_DAYS["30d"])
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    in_window = ShipmentDailyStat.day >= since
+    rows = db.execute(
+        select(
+            ShipmentDailyStat.status,
+            func.sum(ShipmentDailyStat.shipment_count),
+            func.sum(case((in_window, ShipmentDailyStat.shipment_count), else_=0)),
+            func.sum(case((in_window, ShipmentDailyStat.delivered_timed_count), else_=0)),
+            func.sum(case((in_window, ShipmentDailyStat.delivery_seconds), else_=0.0))
+        )
+        .group_by(ShipmentDailyStat.status)
+    ).all()
+    
+    current = {status: count or 0 for status, count, _, _, _ in rows}
+    created = {status: count or 0 for status, _, count, _, _ in rows}
+    timed = sum(timed or 0 for _, _, _, timed, _ in rows)
+    seconds = sum(seconds or 0.0 for _, _, _, _, seconds in rows)
+    return {
+        "total_shipments": sum(created.values()),
+        "in_transit": current.get("in_transit", 0),
+        "at_risk": current.get(AT_RISK_STATUS, 0),
+        "delivered": created.get("delivered", 0),
+        "avg_delivery_time": round(seconds / timed / 86400, 1) if timed else 0.0  # days
+    }
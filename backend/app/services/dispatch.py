@@ -0,0 +1,246 @@
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import numpy as np
+from sqlalchemy import bindparam, func, not_, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models import Driver as DriverModel, Product as ProductModel, Shipment as ShipmentModel
+from app.services.driver_selection import ACTIVE_STATUSES
+from app.services.geocode_cache import Coordinates, normalize_address
+from app.services.response_cache import mark_written
+
+try:
+    from scipy.optimize import linear_sum_assignment
+    SCIPY_AVAILABLE = True
+except ImportError:  # pragma: no cover - scipy is optional at runtime
+    SCIPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+
+# Added to infeasible pairs so the solver assigns as many feasible pairs as it can before minimizing cost
+INFEASIBLE_COST = 1e6
+
+class DispatchProblem(NamedTuple):
+    shipment_ids: np.ndarray
+    origins: List[str]
+    weights: np.ndarray
+    driver_ids: np.ndarray
+    locations: List[str]
+    capacities: np.ndarray
+    ratings: np.ndarray
+    loads: Optional[np.ndarray] = None  # weight each driver already carries; None for empty vans
+
+class DispatchPlan(NamedTuple):
+    assignments: List[Dict]
+    unassigned: List[int]
+    total_cost: float
+    solver: str
+    drivers_considered: int
+    solve_ms: float
+
+def load_problem(db: Session, shipment_ids: Optional[Sequence[int]] = None) -> DispatchProblem:
+    """Shipments to dispatch (the given ids, or every pending one) and every available driver"""
+    query = (
+        select(ShipmentModel.id, ShipmentModel.origin, ProductModel.weight)
+        .join(ProductModel, ProductModel.id == ShipmentModel.product_id)
+        .order_by(ShipmentModel.id)
+    )
+    if shipment_ids is None:
+        selected = ShipmentModel.status == "pending"
+    else:
+        selected = ShipmentModel.id.in_(shipment_ids)
+    shipments = db.execute(query.where(selected)).all()
+    
+    drivers = db.execute(
+        select(DriverModel.id, DriverModel.current_location, DriverModel.capacity, DriverModel.rating)
+        .where(DriverModel.availability == True)  # noqa: E712
+        .order_by(DriverModel.id)
+    ).all()
+    
+    # Active shipments still on board count against capacity; the ones being dispatched don't
+    loads = dict(db.execute(
+        select(ShipmentModel.driver_id, func.sum(ProductModel.weight))
+        .join(ProductModel, ProductModel.id == ShipmentModel.product_id)
+        .where(ShipmentModel.status.in_(ACTIVE_STATUSES), not_(selected))
+        .group_by(ShipmentModel.driver_id)
+    ).all())
+    
+    return DispatchProblem(
+        shipment_ids=np.array([row[0] for row in shipments], dtype=np.int64),
+        origins=[row[1] for row in shipments],
+        weights=np.array([row[2] for row in shipments], dtype=np.float64),
+        driver_ids=np.array([row[0] for row in drivers], dtype=np.int64),
+        locations=[row[1] for row in drivers],
+        capacities=np.array([row[2] for row in drivers], dtype=np.float64),
+        ratings=np.array([5.0 if row[3] is None else row[3] for row in drivers], dtype=np.float64),
+        loads=np.array([loads.get(row[0]) or 0.0 for row in drivers], dtype=np.float64)
+    )
+
+def problem_addresses(problem: DispatchProblem) -> Dict[str, str]:
+    """One address per distinct normalized key, for geocoding before `solve`"""
+    return {normalize_address(address): address for address in problem.origins + problem.locations}
+
+def _address_index(addresses: List[str]):
+    """Distinct normalized addresses, and each input's position among them"""
+    keys = [normalize_address(address) for address in addresses]
+    distinct = list(dict.fromkeys(keys))
+    position = {key: i for i, key in enumerate(distinct)}
+    return distinct, np.array([position[key] for key in keys], dtype=np.int64)
+
+def _haversine_km(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Great-circle distances between every (lon, lat) in `a` and every one in `b`"""
+    lon1, lat1 = np.radians(a[:, 0])[:, None], np.radians(a[:, 1])[:, None]
+    lon2, lat2 = np.radians(b[:, 0])[None, :], np.radians(b[:, 1])[None, :]
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+def _coords_array(addresses: List[str], coords: Dict[str, Optional[Coordinates]]) -> np.ndarray:
+    return np.array([coords.get(address) or (np.nan, np.nan) for address in addresses], dtype=np.float64).reshape(-1, 2)
+
+class CostModel:
+    """Shipment x driver costs: rating and pickup distance, with infeasible pairs at INFEASIBLE_COST.
+    
+    Distances are computed once per distinct (origin, driver location) pair, so the
+    full matrix is a gather over a small table rather than per-cell trigonometry.
+    """
+    
+    def __init__(self, problem: DispatchProblem, coords: Dict[str, Optional[Coordinates]]):
+        self.problem = problem
+        origins, self.origin_index = _address_index(problem.origins)
+        locations, self.location_index = _address_index(problem.locations)
+        
+        distances = _haversine_km(_coords_array(origins, coords), _coords_array(locations, coords))
+        # The same place needs no geocoding; anything else we couldn't place gets a flat penalty
+        same = np.array(origins, dtype=object)[:, None] == np.array(locations, dtype=object)[None, :]
+        distances[same] = 0.0
+        self.distances = np.nan_to_num(distances, nan=settings.dispatch_unknown_distance_km)
+        
+        self.rating_cost = settings.dispatch_rating_weight * (5.0 - problem.ratings) / 4.0
+    
+    def distance(self, rows, columns) -> np.ndarray:
+        return self.distances[np.ix_(self.origin_index[rows], self.location_index[columns])]
+    
+    def matrix(self, rows, columns, capacities: Optional[np.ndarray] = None) -> np.ndarray:
+        """Costs for `rows` x `columns`; `capacities` is the room left per driver, full capacity by default"""
+        if capacities is None:
+            capacities = self.problem.capacities
+        cost = settings.dispatch_distance_weight * self.distance(rows, columns) / settings.dispatch_distance_scale_km
+        cost += self.rating_cost[columns][None, :]
+        cost[self.problem.weights[rows][:, None] > capacities[columns][None, :]] += INFEASIBLE_COST
+        return cost
+
+def _candidate_drivers(model: CostModel, rows: np.ndarray, columns: np.ndarray, per_shipment: int, capacities: np.ndarray) -> np.ndarray:
+    """Drivers among the `per_shipment` cheapest for at least one shipment, found block by block"""
+    block = max(1, settings.dispatch_max_matrix_cells // max(1, len(columns)))
+    keep = set()
+    for start in range(0, len(rows), block):
+        cost = model.matrix(rows[start:start + block], columns, capacities)
+        nearest = np.argpartition(cost, per_shipment - 1, axis=1)[:, :per_shipment]
+        keep.update(columns[nearest[np.take_along_axis(cost, nearest, axis=1) < INFEASIBLE_COST]].tolist())
+    return np.array(sorted(keep), dtype=np.int64)
+
+def _greedy(cost: np.ndarray):
+    """Cheapest feasible pair first; used when scipy isn't installed"""
+    flat = np.flatnonzero(cost < INFEASIBLE_COST)
+    flat = flat[np.argsort(cost.ravel()[flat], kind="stable")]
+    used_rows = np.zeros(cost.shape[0], dtype=bool)
+    used_columns = np.zeros(cost.shape[1], dtype=bool)
+    rows, columns = [], []
+    limit = min(cost.shape)
+    for row, column in zip(*np.unravel_index(flat, cost.shape)):
+        if used_rows[row] or used_columns[column]:
+            continue
+        used_rows[row] = used_columns[column] = True
+        rows.append(row)
+        columns.append(column)
+        if len(rows) == limit:
+            break
+    return np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)
+
+def solve(problem: DispatchProblem, coords: Dict[str, Optional[Coordinates]], max_per_driver: int = 1) -> DispatchPlan:
+    """Assign shipments to drivers minimizing total cost, at most `max_per_driver` each.
+    
+    `coords` maps normalized addresses to (lon, lat). Shipments no available driver
+    can carry are returned as unassigned. Each pass gives a driver at most one more
+    shipment, so what a driver is given never exceeds its capacity less its current load.
+    """
+    started = time.perf_counter()
+    model = CostModel(problem, coords)
+    solver = "hungarian" if SCIPY_AVAILABLE else "greedy"
+    per_shipment = settings.dispatch_candidates_per_shipment
+    rows = np.arange(len(problem.shipment_ids))
+    free_slots = np.full(len(problem.driver_ids), max_per_driver, dtype=np.int64)
+    remaining = problem.capacities - (problem.loads if problem.loads is not None else 0.0)
+    considered = np.zeros(len(problem.driver_ids), dtype=bool)
+    assigned_rows, assigned_drivers, costs = [], [], []
+    
+    # One column per driver and pass: whether a second shipment fits depends on which
+    # one the driver got first, so capacity is only known between passes. Passes also
+    # pick up shipments a pruned solve left without a candidate.
+    while len(rows):
+        columns = np.flatnonzero((free_slots > 0) & (remaining > 0))
+        if not len(columns):
+            break
+        if len(rows) * len(columns) > settings.dispatch_max_matrix_cells and per_shipment < len(columns):
+            # Too big to solve densely: keep only drivers that are a top candidate for some shipment
+            columns = _candidate_drivers(model, rows, columns, per_shipment, remaining)
+        considered[columns] = True
+        
+        cost = model.matrix(rows, columns, remaining)
+        if SCIPY_AVAILABLE:
+            row_index, column_index = linear_sum_assignment(cost)
+        else:
+            row_index, column_index = _greedy(cost)
+        
+        feasible = cost[row_index, column_index] < INFEASIBLE_COST
+        row_index, column_index = row_index[feasible], column_index[feasible]
+        if not len(row_index):
+            break
+        drivers = columns[column_index]
+        free_slots[drivers] -= 1
+        remaining[drivers] -= problem.weights[rows[row_index]]
+        assigned_rows.append(rows[row_index])
+        assigned_drivers.append(drivers)
+        costs.append(cost[row_index, column_index])
+        rows = np.delete(rows, row_index)
+    
+    assigned_rows = np.concatenate(assigned_rows or [np.empty(0, dtype=np.int64)])
+    assigned_drivers = np.concatenate(assigned_drivers or [np.empty(0, dtype=np.int64)])
+    costs = np.concatenate(costs or [np.empty(0)])
+    distances = model.distances[model.origin_index[assigned_rows], model.location_index[assigned_drivers]]
+    
+    assignments = [
+        {
+            "shipment_id": int(problem.shipment_ids[row]),
+            "driver_id": int(problem.driver_ids[driver]),
+            "cost": round(float(row_cost), 4),
+            "distance_km": round(float(distance), 1)
+        }
+        for row, driver, row_cost, distance in sorted(zip(assigned_rows, assigned_drivers, costs, distances))
+    ]
+    
+    solve_ms = (time.perf_counter() - started) * 1000
+    logger.debug("Dispatched %d/%d shipments with %s in %.1f ms", len(assignments), len(problem.shipment_ids), solver, solve_ms)
+    return DispatchPlan(
+        assignments=assignments,
+        unassigned=problem.shipment_ids[np.sort(rows)].tolist(),
+        total_cost=round(float(costs.sum()), 4),
+        solver=solver,
+        drivers_considered=int(considered.sum()),
+        solve_ms=round(solve_ms, 1)
+    )
+
+def apply_plan(db: Session, plan: DispatchPlan) -> int:
+    """Write the plan's driver assignments to the shipments table"""
+    table = ShipmentModel.__table__
+    if plan.assignments:
+        db.execute(
+            update(table).where(table.c.id == bindparam("assigned_id")).values(driver_id=bindparam("assigned_driver")),
+            [{"assigned_id": a["shipment_id"], "assigned_driver": a["driver_id"]} for a in plan.assignments]
+        )
+        mark_written(db, table.name)
+    db.commit()
+    return len(plan.assignments)
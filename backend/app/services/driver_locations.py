@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import math
+import threading
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import and_, event, not_, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, ensure_columns
+from app.models import Driver as DriverModel
+from app.services.eta_service import eta_service
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 2 * math.pi * EARTH_RADIUS_KM / 360
+
+Cell = Tuple[int, int]
+
+# What the geocoder returns in demo mode (no API key); never a real driver position
+PLACEHOLDER_COORDINATES = (0.0, 0.0)
+
+class IndexedDriver(NamedTuple):
+    latitude: float
+    longitude: float
+    available: bool
+    capacity: float
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, h)))
+
+class DriverGridIndex:
+    """In-memory grid of driver positions for k-nearest queries.
+    
+    Drivers are bucketed into square lat/lon cells. A query scans rings of cells
+    outward from the query point and stops once no unscanned cell can hold
+    anything closer than the k-th driver found so far.
+    """
+    
+    def __init__(self, cell_degrees: float):
+        self.cell_degrees = cell_degrees
+        self._drivers: Dict[int, IndexedDriver] = {}
+        self._cells: Dict[Cell, Set[int]] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._drivers)
+    
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+    
+    def upsert(self, driver_id: int, latitude: Optional[float], longitude: Optional[float], available: bool, capacity: float) -> None:
+        """Add or move a driver; drivers without coordinates are dropped from the index"""
+        with self._lock:
+            self._discard(driver_id)
+            if latitude is None or longitude is None:
+                return
+            self._drivers[driver_id] = IndexedDriver(latitude, longitude, bool(available), capacity or 0.0)
+            self._cells.setdefault(self._cell(latitude, longitude), set()).add(driver_id)
+    
+    def remove(self, driver_id: int) -> None:
+        with self._lock:
+            self._discard(driver_id)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._drivers.clear()
+            self._cells.clear()
+    
+    def _discard(self, driver_id: int) -> None:
+        entry = self._drivers.pop(driver_id, None)
+        if entry is not None:
+            cell = self._cell(entry.latitude, entry.longitude)
+            members = self._cells[cell]
+            members.discard(driver_id)
+            if not members:
+                del self._cells[cell]
+    
+    def _ring(self, center: Cell, radius: int):
+        row, column = center
+        if radius == 0:
+            yield center
+            return
+        for d in range(-radius, radius + 1):
+            yield row - radius, column + d
+            yield row + radius, column + d
+        for d in range(-radius + 1, radius):
+            yield row + d, column - radius
+            yield row + d, column + radius
+    
+    def _ring_clearance_km(self, latitude: float, radius: int) -> float:
+        """Lower bound on the distance from the query to any cell outside the first `radius` rings"""
+        degrees = radius * self.cell_degrees
+        # Longitude degrees shrink towards the poles; use the widest latitude those cells could reach
+        widest = min(90.0, abs(latitude) + degrees)
+        return degrees * KM_PER_DEGREE * min(1.0, math.cos(math.radians(widest)))
+    
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 5,
+        min_capacity: float = 0.0,
+        available_only: bool = True,
+        max_distance_km: Optional[float] = None
+    ) -> List[Tuple[int, float]]:
+        """Up to k (driver_id, distance_km) pairs, nearest first"""
+        with self._lock:
+            if not self._cells:
+                return []
+            center = self._cell(latitude, longitude)
+            found: List[Tuple[float, int]] = []
+            
+            def scan(cells) -> None:
+                for cell in cells:
+                    for driver_id in self._cells.get(cell, ()):
+                        entry = self._drivers[driver_id]
+                        if (available_only and not entry.available) or entry.capacity < min_capacity:
+                            continue
+                        found.append((haversine_km(latitude, longitude, entry.latitude, entry.longitude), driver_id))
+            
+            radius = 0
+            while True:
+                if 8 * radius > len(self._cells):
+                    # Sparse grid: the ring would visit more empty cells than there are occupied ones
+                    scan([
+                        cell for cell in self._cells
+                        if max(abs(cell[0] - center[0]), abs(cell[1] - center[1])) >= radius
+                    ])
+                    break
+                scan(self._ring(center, radius))
+                
+                clearance = self._ring_clearance_km(latitude, radius)
+                if max_distance_km is not None and clearance > max_distance_km:
+                    break
+                if len(found) >= k:
+                    found.sort()
+                    if found[k - 1][0] <= clearance:
+                        break
+                radius += 1
+        
+        found.sort()
+        return [
+            (driver_id, distance) for distance, driver_id in found[:k]
+            if max_distance_km is None or distance <= max_distance_km
+        ]
+
+driver_index = DriverGridIndex(settings.driver_grid_cell_degrees)
+
+def ensure_location_columns(engine: Engine) -> None:
+    """Add the coordinate columns to drivers tables created before they existed"""
+    ensure_columns(engine, DriverModel.__table__, {"latitude": "FLOAT", "longitude": "FLOAT"})
+
+def _placeholder_location():
+    return and_(DriverModel.latitude == PLACEHOLDER_COORDINATES[1], DriverModel.longitude == PLACEHOLDER_COORDINATES[0])
+
+def load_driver_index(db: Session) -> int:
+    """Fill the index from every driver with coordinates"""
+    rows = db.execute(
+        select(DriverModel.id, DriverModel.latitude, DriverModel.longitude, DriverModel.availability, DriverModel.capacity)
+        .where(DriverModel.latitude.is_not(None), DriverModel.longitude.is_not(None), not_(_placeholder_location()))
+    ).all()
+    driver_index.clear()
+    for row in rows:
+        driver_index.upsert(*row)
+    logger.info("Loaded %d driver locations", len(rows))
+    return len(rows)
+
+@event.listens_for(Session, "after_flush")
+def _collect_driver_changes(session: Session, flush_context) -> None:
+    """Remember changed drivers; the index is only updated once the transaction commits"""
+    changes = session.info.setdefault("driver_locations", {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, DriverModel):
+            changes[obj.id] = (obj.latitude, obj.longitude, obj.availability, obj.capacity)
+    for obj in session.deleted:
+        if isinstance(obj, DriverModel):
+            changes[obj.id] = None
+
+@event.listens_for(Session, "after_commit")
+def _apply_driver_changes(session: Session) -> None:
+    changes = session.info.pop("driver_locations", None)
+    for driver_id, values in (changes or {}).items():
+        if values is None:
+            driver_index.remove(driver_id)
+        else:
+            driver_index.upsert(driver_id, *values)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_driver_changes(session: Session) -> None:
+    session.info.pop("driver_locations", None)
+
+def _store_coordinates(driver_id: int, address: str, coords: Optional[Tuple[float, float]]) -> bool:
+    db = SessionLocal()
+    try:
+        driver = db.get(DriverModel, driver_id)
+        # Skip drivers deleted or moved again while we were geocoding
+        if driver is None or driver.current_location != address:
+            return False
+        driver.longitude, driver.latitude = coords if coords else (None, None)
+        db.commit()
+        return coords is not None
+    finally:
+        db.close()
+
+async def geocode_driver(driver_id: int, address: str) -> bool:
+    """Geocode a driver's current_location into latitude/longitude; meant to run as a background task"""
+    if not settings.openrouteservice_api_key:
+        # Demo mode only has placeholder coordinates; leave the driver ungeocoded for a later backfill
+        return False
+    coords = await eta_service._geocode_address(address)
+    if coords == PLACEHOLDER_COORDINATES:
+        coords = None
+    if coords is None:
+        logger.warning("Could not geocode location of driver %d: %r", driver_id, address)
+    return await asyncio.to_thread(_store_coordinates, driver_id, address, coords)
+
+async def geocode_missing_drivers(limit: int) -> int:
+    """Geocode up to `limit` drivers that have a location but no coordinates, e.g. after a bulk import"""
+    if not settings.openrouteservice_api_key:
+        return 0
+    
+    def pending():
+        db = SessionLocal()
+        try:
+            return db.execute(
+                select(DriverModel.id, DriverModel.current_location)
+                # Includes placeholders stored before demo-mode geocodes were skipped
+                .where(or_(DriverModel.latitude.is_(None), _placeholder_location()))
+                .order_by(DriverModel.id)
+                .limit(limit)
+            ).all()
+        finally:
+            db.close()
+    
+    drivers = await asyncio.to_thread(pending)
+    semaphore = asyncio.Semaphore(settings.route_cache_warm_concurrency)
+    
+    async def geocode(driver_id: int, address: str) -> bool:
+        async with semaphore:
+            return await geocode_driver(driver_id, address)
+    
+    results = await asyncio.gather(*(geocode(driver_id, address) for driver_id, address in drivers))
+    return sum(results)
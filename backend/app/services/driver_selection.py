@@ -0,0 +1,85 @@
+from typing import List, NamedTuple, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from app.models import Driver as DriverModel, Shipment as ShipmentModel
+from app.services.driver_locations import driver_index
+from app.services.geocode_cache import Coordinates
+
+# Shipments that still occupy their driver
+ACTIVE_STATUSES = ("pending", "in_transit", "delayed")
+
+class DriverCandidate(NamedTuple):
+    driver: DriverModel
+    active_shipments: Optional[int] = None  # None unless ranked by load
+    at_origin: Optional[bool] = None  # None unless ranked by proximity
+    distance_km: Optional[float] = None  # None unless ranked by distance
+
+def _eligible(weight: float):
+    return (DriverModel.availability == True, DriverModel.capacity >= weight)  # noqa: E712
+
+def active_shipment_count():
+    """Correlated count of a driver's unfinished shipments, served by ix_shipments_driver_status"""
+    return (
+        select(func.count(ShipmentModel.id))
+        .where(ShipmentModel.driver_id == DriverModel.id, ShipmentModel.status.in_(ACTIVE_STATUSES))
+        .correlate(DriverModel)
+        .scalar_subquery()
+    )
+
+def rank_drivers(
+    db: Session,
+    weight: float,
+    k: int = 1,
+    origin: Optional[str] = None,
+    balance_load: bool = False
+) -> List[DriverCandidate]:
+    """Top-k available drivers that can carry `weight`, best rating first.
+    
+    Ties on rating go to drivers already at `origin`, then to the fewest active
+    shipments, then to the lowest id so the ranking is stable.
+    """
+    eligible = _eligible(weight)
+    columns = [DriverModel]
+    ordering = [DriverModel.rating.desc()]
+    
+    if origin is not None or balance_load:
+        # Tie-breakers are only evaluated for drivers rated at least as well as the k-th best
+        threshold = db.execute(
+            select(DriverModel.rating).where(*eligible)
+            .order_by(DriverModel.rating.desc()).offset(k - 1).limit(1)
+        ).scalar()
+        if threshold is not None:
+            eligible += (DriverModel.rating >= threshold,)
+    
+    if origin is not None:
+        at_origin = func.lower(DriverModel.current_location) == origin.strip().lower()
+        columns.append(at_origin)
+        ordering.append(case((at_origin, 0), else_=1))
+    if balance_load:
+        load = active_shipment_count()
+        columns.append(load)
+        ordering.append(load)
+    
+    rows = db.execute(select(*columns).where(*eligible).order_by(*ordering, DriverModel.id).limit(k)).all()
+    candidates = []
+    for row in rows:
+        extras = iter(row[1:])
+        candidates.append(DriverCandidate(
+            driver=row[0],
+            at_origin=bool(next(extras)) if origin is not None else None,
+            active_shipments=next(extras) if balance_load else None
+        ))
+    return candidates
+
+def nearest_drivers(db: Session, weight: float, near: Coordinates, k: int = 1) -> List[DriverCandidate]:
+    """The k available drivers closest to `near` (lon, lat) that can carry `weight`, from the in-memory grid"""
+    longitude, latitude = near
+    nearest = driver_index.nearest(latitude, longitude, k, min_capacity=weight)
+    drivers = {
+        driver.id: driver
+        for driver in db.query(DriverModel).filter(DriverModel.id.in_([driver_id for driver_id, _ in nearest]))
+    }
+    return [
+        DriverCandidate(driver=drivers[driver_id], distance_km=round(distance, 3))
+        for driver_id, distance in nearest if driver_id in drivers
+    ]
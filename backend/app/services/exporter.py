@@ -0,0 +1,228 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from sqlalchemy import DateTime, Float, Integer, select
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.models import Shipment as ShipmentModel
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - pyarrow is optional at runtime
+    ARROW_AVAILABLE = False
+
+try:
+    from openpyxl import Workbook
+    XLSX_AVAILABLE = True
+except ImportError:  # pragma: no cover - openpyxl is optional at runtime
+    XLSX_AVAILABLE = False
+
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": PARQUET_MEDIA_TYPE
+}
+
+# Bytes read per chunk when streaming a finished XLSX file back out
+XLSX_READ_SIZE = 1024 * 1024
+
+# Columns exported from the shipments table, in output order
+SHIPMENT_EXPORT_COLUMNS = [
+    ShipmentModel.id,
+    ShipmentModel.client_id,
+    ShipmentModel.product_id,
+    ShipmentModel.driver_id,
+    ShipmentModel.transporter_id,
+    ShipmentModel.origin,
+    ShipmentModel.destination,
+    ShipmentModel.estimated_eta,
+    ShipmentModel.actual_eta,
+    ShipmentModel.status,
+    ShipmentModel.transport_mode,
+    ShipmentModel.priority,
+    ShipmentModel.confidence_score,
+    ShipmentModel.weather_delay_factor,
+    ShipmentModel.route_distance,
+    ShipmentModel.route_duration,
+    ShipmentModel.created_at,
+    ShipmentModel.updated_at
+]
+
+def shipment_export_rows(db: Session, batch_size: int) -> Iterator[List[tuple]]:
+    """Yield shipment rows in id order, one keyset-paginated batch at a time"""
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(*SHIPMENT_EXPORT_COLUMNS)
+            .where(ShipmentModel.id > last_id)
+            .order_by(ShipmentModel.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def _arrow_type(column):
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        # SQLite hands back naive datetimes, so the column is stored without a zone
+        return pa.timestamp("us")
+    return pa.string()
+
+def shipment_arrow_schema() -> "pa.Schema":
+    return pa.schema([pa.field(column.key, _arrow_type(column)) for column in SHIPMENT_EXPORT_COLUMNS])
+
+class _ByteSink:
+    """Write-only file object that collects what the Parquet writer emits until it's drained"""
+    
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        # The writer records row group offsets from this, so it counts every byte ever written
+        return self._position
+    
+    def flush(self) -> None:
+        pass
+    
+    def close(self) -> None:
+        self.closed = True
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+def stream_parquet(batches: Iterator[Dict[str, list]], schema: "pa.Schema", compression: str = "snappy") -> Iterator[bytes]:
+    """Encode column batches as Parquet, one row group per batch, yielding bytes as each group is written"""
+    sink = _ByteSink()
+    with pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression=compression) as writer:
+        for columns in batches:
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    # Closing the writer appends the footer
+    yield sink.drain()
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def stream_csv(header: Sequence[str], batches: Iterator[Sequence[tuple]]) -> Iterator[bytes]:
+    """Write rows through csv.writer, so fields are quoted and escaped, yielding one encoded block per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def stream_ndjson(header: Sequence[str], batches: Iterator[Sequence[tuple]]) -> Iterator[bytes]:
+    """One JSON object per line"""
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(header, row)), default=_json_default) + "\n" for row in rows
+        ).encode("utf-8")
+
+def stream_json(header: Sequence[str], batches: Iterator[Sequence[tuple]]) -> Iterator[bytes]:
+    """A single JSON array, written element by element"""
+    separator = "["
+    for rows in batches:
+        parts = []
+        for row in rows:
+            parts.append(separator)
+            parts.append(json.dumps(dict(zip(header, row)), default=_json_default))
+            separator = ","
+        yield "".join(parts).encode("utf-8")
+    yield b"[]" if separator == "[" else b"]"
+
+def stream_xlsx(header: Sequence[str], batches: Iterator[Sequence[tuple]]) -> Iterator[bytes]:
+    """Build a real XLSX with a write-only workbook, which keeps memory flat, then stream the file"""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("export")
+    sheet.append(list(header))
+    for rows in batches:
+        for row in rows:
+            sheet.append(list(row))
+    
+    # The zip directory is written last, so the workbook has to be finished before anything is sent
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(XLSX_READ_SIZE)
+                if not data:
+                    break
+                yield data
+    finally:
+        os.remove(path)
+
+def stream_parquet_rows(header: Sequence[str], batches: Iterator[Sequence[tuple]], schema: "pa.Schema") -> Iterator[bytes]:
+    """Parquet from row batches, transposed to columns one batch at a time"""
+    columns = (dict(zip(header, map(list, zip(*rows)))) for rows in batches)
+    return stream_parquet(columns, schema)
+
+ROW_WRITERS = {
+    "csv": stream_csv,
+    "json": stream_json,
+    "ndjson": stream_ndjson,
+    "xlsx": stream_xlsx
+}
+
+def export_shipments(file_format: str, batch_size: int) -> Iterator[bytes]:
+    """Stream the shipments table with its own session, so it can outlive the request handler"""
+    header = [column.key for column in SHIPMENT_EXPORT_COLUMNS]
+    db = SessionLocal()
+    try:
+        batches = shipment_export_rows(db, batch_size)
+        if file_format == "parquet":
+            yield from stream_parquet_rows(header, batches, shipment_arrow_schema())
+        else:
+            yield from ROW_WRITERS[file_format](header, batches)
+    finally:
+        db.close()
+
+def export_records(
+    file_format: str, records: List[Dict[str, Any]], fields: Optional[Sequence[str]] = None
+) -> Iterator[bytes]:
+    """Export a small in-memory list of dicts in any of the export formats.
+    
+    `fields` sets the columns and their order, so an empty export still has a header;
+    by default they are taken from the first record.
+    """
+    header = list(fields) if fields is not None else list(records[0]) if records else []
+    if file_format == "parquet":
+        table = pa.Table.from_pydict({name: [record.get(name) for record in records] for name in header})
+        return stream_parquet(iter([table.to_pydict()]), table.schema)
+    
+    rows = [tuple(record.get(name) for name in header) for record in records]
+    return ROW_WRITERS[file_format](header, iter([rows]))
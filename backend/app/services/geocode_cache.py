@@ -0,0 +1,72 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional, Tuple
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import GeocodeCacheEntry
+from app.services.cache import MISSING, TieredCache
+
+Coordinates = Tuple[float, float]  # lon, lat
+
+def normalize_address(address: str) -> str:
+    """Normalize an address so trivially different spellings share a cache entry"""
+    address = " ".join(address.split()).lower()
+    address = re.sub(r"\s*,\s*", ", ", address)
+    return address.strip(" ,.")
+
+class GeocodeCache(TieredCache):
+    """Geocode cache backed by the `geocode_cache` table.
+    
+    Addresses that could not be geocoded are cached for a shorter TTL.
+    """
+    
+    def __init__(self, session_factory=SessionLocal):
+        super().__init__(settings.geocode_cache_size, settings.geocode_cache_ttl, session_factory)
+    
+    async def get_or_fetch(
+        self,
+        address: str,
+        fetch: Callable[[str], Awaitable[Optional[Coordinates]]]
+    ) -> Optional[Coordinates]:
+        """Return cached coordinates for an address, calling `fetch` on a miss.
+        
+        `fetch` should return None when the address has no match and raise on
+        transport errors, which are never cached.
+        """
+        return await super().get_or_fetch(normalize_address(address), lambda: fetch(address))
+    
+    def ttl_for(self, coords: Optional[Coordinates]) -> float:
+        return settings.geocode_cache_ttl if coords else settings.geocode_negative_ttl
+    
+    def _read_persisted(self, key: str):
+        db = self.session_factory()
+        try:
+            entry = db.get(GeocodeCacheEntry, key)
+            if entry is None:
+                return MISSING
+            
+            ttl = self._remaining_ttl(entry.expires_at)
+            if ttl <= 0:
+                return MISSING
+            
+            if entry.longitude is None or entry.latitude is None:
+                return None, ttl
+            return (entry.longitude, entry.latitude), ttl
+        finally:
+            db.close()
+    
+    def _write_persisted(self, key: str, coords: Optional[Coordinates], ttl: float) -> None:
+        db = self.session_factory()
+        try:
+            db.merge(GeocodeCacheEntry(
+                address_key=key,
+                longitude=coords[0] if coords else None,
+                latitude=coords[1] if coords else None,
+                expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl)
+            ))
+            db.commit()
+        except Exception:
+            # The persistent tier is best effort; the in-memory entry still serves
+            db.rollback()
+        finally:
+            db.close()
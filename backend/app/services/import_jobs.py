@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.importer import IMPORT_SPECS, ImportProgress, ImportValidationError, import_chunks, read_file_chunks
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = {COMPLETED, FAILED, CANCELLED}
+
+class ImportCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled"""
+
+class ImportJob:
+    """One file import running on the worker pool"""
+    
+    def __init__(self, entity: str, path: str, file_format: str, chunk_size: int):
+        self.id = uuid.uuid4().hex
+        self.entity = entity
+        self.path = path
+        self.file_format = file_format
+        self.chunk_size = chunk_size
+        self.status = QUEUED
+        self.progress = ImportProgress()
+        self.error: Optional[str] = None
+        self.exception: Optional[BaseException] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.cancel_event = threading.Event()
+        self.future: Optional[Future] = None
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "entity": self.entity,
+            "format": self.file_format,
+            "status": self.status,
+            **self.progress.as_dict(),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+class ImportJobManager:
+    """Runs imports on a thread pool so parsing and commits stay off the event loop"""
+    
+    def __init__(self, max_workers: int, history: int):
+        self.max_workers = max_workers
+        self.history = history
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="import")
+        return self._executor
+    
+    def submit(self, entity: str, path: str, file_format: str = "csv", chunk_size: Optional[int] = None) -> ImportJob:
+        """Queue an import of the file at `path`; the worker deletes the file when done"""
+        job = ImportJob(entity, path, file_format, chunk_size or settings.upload_chunk_size)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self.executor.submit(self._run, job)
+        return job
+    
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def cancel(self, job_id: str) -> Optional[ImportJob]:
+        """Ask a job to stop; a running job stops after its current chunk commits"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            # Never started, so the worker won't clean up after it
+            self._finish(job, CANCELLED)
+            _remove_file(job.path)
+        return job
+    
+    def shutdown(self) -> None:
+        """Cancel outstanding jobs and wait for running ones to reach a chunk boundary"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if not job.finished:
+                self.cancel(job.id)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _run(self, job: ImportJob) -> ImportProgress:
+        spec = IMPORT_SPECS[job.entity]
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        
+        def check_cancelled(progress: ImportProgress) -> None:
+            if job.cancel_event.is_set():
+                raise ImportCancelled()
+        
+        db = SessionLocal()
+        try:
+            check_cancelled(job.progress)
+            chunks = read_file_chunks(job.path, job.file_format, spec.required_columns, job.chunk_size)
+            import_chunks(db, spec, chunks, on_progress=check_cancelled, progress=job.progress)
+            self._finish(job, COMPLETED)
+        except ImportCancelled:
+            db.rollback()
+            self._finish(job, CANCELLED)
+        except Exception as e:
+            db.rollback()
+            if not isinstance(e, ImportValidationError):
+                logger.exception("Import job %s failed", job.id)
+            job.error = str(e)
+            job.exception = e
+            self._finish(job, FAILED)
+        finally:
+            db.close()
+            _remove_file(job.path)
+        return job.progress
+    
+    def _finish(self, job: ImportJob, status: str) -> None:
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        logger.info("Import job %s %s: %s", job.id, status, job.progress.as_dict())
+    
+    def _prune(self) -> None:
+        # Keep every unfinished job plus the most recent finished ones
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self._jobs[job_id]
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+import_jobs = ImportJobManager(settings.import_workers, settings.import_job_history)
@@ -0,0 +1,340 @@
+import json
+import logging
+import os
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.models import Client as ClientModel, Product as ProductModel, Driver as DriverModel, Transporter as TransporterModel
+from app.services.response_cache import mark_written
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:  # pragma: no cover - pyarrow is optional at runtime
+    ARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Upload formats by file extension
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow"
+}
+
+# Stay under SQLite's default host-parameter limit for IN (...) lookups
+KEY_LOOKUP_BATCH = 900
+
+# Skip reasons reported back to the uploader
+SKIP_DUPLICATE_IN_FILE = "duplicate_in_file"
+SKIP_ALREADY_EXISTS = "already_exists"
+
+class ImportValidationError(ValueError):
+    """The uploaded file can't be imported as given"""
+
+class ImportProgress:
+    """Running totals for an import, updated after every committed chunk"""
+    
+    def __init__(self):
+        self.chunks = 0
+        self.rows_processed = 0
+        self.created = 0
+        self.skipped: Dict[str, int] = {}
+    
+    @property
+    def skipped_total(self) -> int:
+        return sum(self.skipped.values())
+    
+    def skip(self, reason: str, count: int) -> None:
+        if count:
+            self.skipped[reason] = self.skipped.get(reason, 0) + count
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "chunks": self.chunks,
+            "rows_processed": self.rows_processed,
+            "created": self.created,
+            "skipped": dict(self.skipped)
+        }
+
+class ImportSpec:
+    """How rows for one entity are validated, deduplicated and converted to insert parameters"""
+    
+    def __init__(
+        self,
+        model,
+        label: str,
+        required_columns: List[str],
+        columns: Dict[str, Callable[[pd.DataFrame], Any]],
+        unique_keys: Optional[List[str]] = None
+    ):
+        self.model = model
+        self.label = label
+        self.required_columns = required_columns
+        self.columns = columns
+        # Columns that must each be unique; rows clashing on any of them are skipped
+        self.unique_keys = unique_keys or []
+    
+    def column_arrays(self, chunk: pd.DataFrame) -> Dict[str, list]:
+        """Convert a chunk column by column into plain Python lists, one per model column"""
+        arrays = {}
+        for name, convert in self.columns.items():
+            values = convert(chunk)
+            arrays[name] = values.tolist() if isinstance(values, pd.Series) else [values] * len(chunk)
+        return arrays
+
+def _text(column: str) -> Callable[[pd.DataFrame], pd.Series]:
+    return lambda chunk: chunk[column].astype(str)
+
+def _number(column: str) -> Callable[[pd.DataFrame], pd.Series]:
+    return lambda chunk: chunk[column].astype(float)
+
+def _constant(value) -> Callable[[pd.DataFrame], Any]:
+    return lambda chunk: value
+
+def _vehicle_types(chunk: pd.DataFrame) -> pd.Series:
+    # Could be a comma-separated string
+    return chunk['vehicle_types'].astype(str).map(
+        lambda value: json.dumps([vt.strip() for vt in value.split(',')])
+    )
+
+IMPORT_SPECS: Dict[str, ImportSpec] = {
+    "clients": ImportSpec(
+        ClientModel,
+        "clients",
+        ['name', 'email', 'phone', 'address', 'city', 'country'],
+        columns={
+            "name": _text('name'),
+            "email": _text('email'),
+            "phone": _text('phone'),
+            "address": _text('address'),
+            "city": _text('city'),
+            "country": _text('country')
+        },
+        unique_keys=['email']
+    ),
+    "products": ImportSpec(
+        ProductModel,
+        "products",
+        ['name', 'category', 'weight', 'dimensions', 'value'],
+        columns={
+            "name": _text('name'),
+            "category": _text('category'),
+            "weight": _number('weight'),
+            "dimensions": _text('dimensions'),
+            "value": _number('value')
+        }
+    ),
+    "drivers": ImportSpec(
+        DriverModel,
+        "drivers",
+        ['name', 'license_number', 'phone', 'email', 'vehicle_type', 'capacity', 'current_location', 'rating'],
+        columns={
+            "name": _text('name'),
+            "license_number": _text('license_number'),
+            "phone": _text('phone'),
+            "email": _text('email'),
+            "vehicle_type": _text('vehicle_type'),
+            "capacity": _number('capacity'),
+            "availability": _constant(True),  # Default to available
+            "current_location": _text('current_location'),
+            "rating": _number('rating')
+        },
+        unique_keys=['email', 'license_number']
+    ),
+    "transporters": ImportSpec(
+        TransporterModel,
+        "transporters",
+        ['name', 'contact_person', 'email', 'phone', 'vehicle_types', 'base_rate', 'rating'],
+        columns={
+            "name": _text('name'),
+            "contact_person": _text('contact_person'),
+            "email": _text('email'),
+            "phone": _text('phone'),
+            "vehicle_types": _vehicle_types,
+            "base_rate": _number('base_rate'),
+            "availability": _constant(True),  # Default to available
+            "rating": _number('rating')
+        },
+        unique_keys=['email']
+    ),
+}
+
+def read_csv_chunks(fileobj: BinaryIO, required_columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a CSV file as DataFrames of at most `chunk_size` rows, checking the header first"""
+    try:
+        fileobj.seek(0)
+        columns = pd.read_csv(fileobj, nrows=0, encoding="utf-8").columns
+    except pd.errors.EmptyDataError:
+        raise ImportValidationError("CSV file is empty")
+    
+    if not all(col in columns for col in required_columns):
+        raise ImportValidationError(f"CSV must contain columns: {', '.join(required_columns)}")
+    
+    fileobj.seek(0)
+    with pd.read_csv(fileobj, chunksize=chunk_size, encoding="utf-8") as reader:
+        yield from reader
+
+def file_format_for(filename: str) -> str:
+    """Pick the upload format from a file name, raising ImportValidationError if unsupported"""
+    suffix = os.path.splitext(filename.lower())[1]
+    file_format = FILE_FORMATS.get(suffix)
+    if file_format is None:
+        raise ImportValidationError("File must be a CSV, Parquet or Arrow IPC file")
+    if file_format != "csv" and not ARROW_AVAILABLE:
+        raise ImportValidationError(f"{file_format.capitalize()} uploads require pyarrow")
+    return file_format
+
+def _check_columns(columns, required_columns: List[str]) -> None:
+    if not all(col in columns for col in required_columns):
+        raise ImportValidationError(f"File must contain columns: {', '.join(required_columns)}")
+
+def _arrow_chunks(batches, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Re-slice Arrow record batches to at most `chunk_size` rows and hand them to pandas"""
+    for batch in batches:
+        # slice() is zero-copy; numeric columns also convert to pandas without copying
+        for start in range(0, batch.num_rows, chunk_size):
+            yield batch.slice(start, chunk_size).to_pandas()
+
+def read_parquet_chunks(path: str, required_columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a Parquet file row group by row group, reading only the required columns"""
+    try:
+        parquet_file = pq.ParquetFile(path, memory_map=True)
+    except (pa.ArrowInvalid, OSError) as e:
+        raise ImportValidationError(f"Invalid Parquet file: {e}")
+    _check_columns(parquet_file.schema_arrow.names, required_columns)
+    
+    try:
+        yield from _arrow_chunks(parquet_file.iter_batches(batch_size=chunk_size, columns=required_columns), chunk_size)
+    finally:
+        parquet_file.close()
+
+def read_arrow_chunks(path: str, required_columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream an Arrow IPC file (or stream) from a memory map without copying column buffers"""
+    with pa.memory_map(path, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            # Not the random-access file format; try the streaming format
+            source.seek(0)
+            try:
+                reader = pa.ipc.open_stream(source)
+            except pa.ArrowInvalid as e:
+                raise ImportValidationError(f"Invalid Arrow IPC file: {e}")
+            batches = reader
+        _check_columns(reader.schema.names, required_columns)
+        
+        selected = (batch.select(required_columns) for batch in batches)
+        yield from _arrow_chunks(selected, chunk_size)
+
+def read_file_chunks(path: str, file_format: str, required_columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Stream a CSV, Parquet or Arrow IPC file on disk as DataFrame chunks"""
+    if file_format == "parquet":
+        yield from read_parquet_chunks(path, required_columns, chunk_size)
+    elif file_format == "arrow":
+        yield from read_arrow_chunks(path, required_columns, chunk_size)
+    else:
+        with open(path, "rb") as fileobj:
+            yield from read_csv_chunks(fileobj, required_columns, chunk_size)
+
+def import_chunks(
+    db: Session,
+    spec: ImportSpec,
+    chunks: Iterator[pd.DataFrame],
+    on_progress: Optional[Callable[[ImportProgress], None]] = None,
+    progress: Optional[ImportProgress] = None
+) -> ImportProgress:
+    """Import DataFrame chunks, committing after each one so memory stays bounded"""
+    progress = progress if progress is not None else ImportProgress()
+    try:
+        for chunk in chunks:
+            _import_chunk(db, spec, chunk, progress)
+            if on_progress is not None:
+                on_progress(progress)
+    finally:
+        # Release the reader even if a chunk fails part way through the file
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return progress
+
+def bulk_insert(db: Session, table, names: List[str], rows: List[tuple]) -> None:
+    """Insert positional rows into `table` with one executemany.
+    
+    On SQLite the tuples go straight to the driver, skipping SQLAlchemy's
+    per-row parameter processing. Other databases use a Core insert().
+    """
+    # Scalar Python-side column defaults aren't applied to raw driver inserts
+    defaults = {
+        column.name: column.default.arg
+        for column in table.columns
+        if column.name not in names and column.default is not None and column.default.is_scalar
+    }
+    if defaults:
+        names = names + list(defaults)
+        rows = [row + tuple(defaults.values()) for row in rows]
+    
+    if db.get_bind().dialect.name == "sqlite":
+        quote = db.get_bind().dialect.identifier_preparer.quote
+        sql = (
+            f"INSERT INTO {quote(table.name)} ({', '.join(quote(name) for name in names)}) "
+            f"VALUES ({', '.join('?' for _ in names)})"
+        )
+        db.connection().exec_driver_sql(sql, rows)
+    else:
+        db.execute(insert(table), [dict(zip(names, row)) for row in rows])
+    mark_written(db, table.name)
+
+def existing_keys(db: Session, column, values: List[Any]) -> set:
+    """Return which of `values` are already stored in `column`, in a few IN queries"""
+    unique_values = list(set(values))
+    found = set()
+    for start in range(0, len(unique_values), KEY_LOOKUP_BATCH):
+        batch = unique_values[start:start + KEY_LOOKUP_BATCH]
+        found.update(db.execute(select(column).where(column.in_(batch))).scalars())
+    return found
+
+def _dedupe_chunk(db: Session, spec: ImportSpec, arrays: Dict[str, list], progress: ImportProgress) -> Optional[pd.Series]:
+    """Build a keep-mask for the chunk, dropping in-file duplicates and rows already in the table"""
+    if not spec.unique_keys:
+        return None
+    
+    keys = pd.DataFrame({key: arrays[key] for key in spec.unique_keys})
+    duplicate = pd.Series(False, index=keys.index)
+    for key in spec.unique_keys:
+        duplicate |= keys[key].duplicated()
+    progress.skip(SKIP_DUPLICATE_IN_FILE, int(duplicate.sum()))
+    
+    # Earlier chunks are already committed, so this also catches repeats across chunks
+    exists = pd.Series(False, index=keys.index)
+    for key in spec.unique_keys:
+        found = existing_keys(db, getattr(spec.model, key), keys[key][~duplicate].tolist())
+        if found:
+            exists |= keys[key].isin(found)
+    exists &= ~duplicate
+    progress.skip(SKIP_ALREADY_EXISTS, int(exists.sum()))
+    
+    return ~(duplicate | exists)
+
+def _import_chunk(db: Session, spec: ImportSpec, chunk: pd.DataFrame, progress: ImportProgress) -> None:
+    """Insert one chunk of rows with a single executemany and commit it"""
+    arrays = spec.column_arrays(chunk)
+    names = list(arrays)
+    rows = list(zip(*arrays.values()))
+    keep = _dedupe_chunk(db, spec, arrays, progress)
+    if keep is not None:
+        rows = [row for row, kept in zip(rows, keep.tolist()) if kept]
+    
+    if rows:
+        bulk_insert(db, spec.model.__table__, names, rows)
+        progress.created += len(rows)
+    
+    db.commit()
+    progress.chunks += 1
+    progress.rows_processed += len(chunk)
+    logger.info("Imported %s chunk %d: %s", spec.label, progress.chunks, progress.as_dict())
@@ -0,0 +1,205 @@
+import asyncio
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+
+try:
+    import reportlab  # noqa: F401
+    PDF_AVAILABLE = True
+except ImportError:  # pragma: no cover - reportlab is optional at runtime
+    PDF_AVAILABLE = False
+
+try:
+    from pypdf import PdfWriter
+    PDF_MERGE_AVAILABLE = True
+except ImportError:  # pragma: no cover - pypdf is optional at runtime
+    PDF_MERGE_AVAILABLE = False
+
+InvoiceRows = List[List[str]]
+
+def invoice_rows(shipment) -> InvoiceRows:
+    """The label/value table printed on a shipment's invoice, as plain strings a worker process can receive"""
+    data = [
+        ['Shipment ID:', str(shipment.id)],
+        ['Origin:', shipment.origin],
+        ['Destination:', shipment.destination],
+        ['Status:', shipment.status.upper()],
+        ['Estimated ETA:', shipment.estimated_eta.strftime('%Y-%m-%d %H:%M')],
+        ['Distance:', f"{shipment.route_distance/1000:.1f} km"],
+        ['Confidence Score:', f"{shipment.confidence_score*100:.1f}%"],
+    ]
+    
+    if shipment.client:
+        data.extend([
+            ['Client Name:', shipment.client.name],
+            ['Client Email:', shipment.client.email],
+        ])
+    
+    if shipment.product:
+        data.extend([
+            ['Product:', shipment.product.name],
+            ['Category:', shipment.product.category],
+            ['Weight:', f"{shipment.product.weight} kg"],
+            ['Value:', f"${shipment.product.value:.2f}"],
+        ])
+    
+    if shipment.driver:
+        data.extend([
+            ['Driver:', shipment.driver.name],
+            ['Driver Phone:', shipment.driver.phone],
+            ['Vehicle Type:', shipment.driver.vehicle_type],
+        ])
+    
+    return data
+
+# Per-process template, built once by the pool initializer instead of per invoice
+_template: Optional[Dict] = None
+
+def _load_template() -> Dict:
+    global _template
+    if _template is None:
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+        from reportlab.lib.units import inch
+        from reportlab.pdfbase.pdfmetrics import getFont
+        from reportlab.platypus import TableStyle
+        
+        styles = getSampleStyleSheet()
+        _template = {
+            "pagesize": letter,
+            "title_style": ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                spaceAfter=30,
+                alignment=1  # Center
+            ),
+            "table_style": TableStyle([
+                ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+                ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+                ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black)
+            ]),
+            "col_widths": [2*inch, 4*inch]
+        }
+        # Load font metrics now rather than on the first invoice
+        for font in ('Helvetica', 'Helvetica-Bold'):
+            getFont(font)
+    return _template
+
+def _invoice_story(rows: InvoiceRows) -> list:
+    from reportlab.platypus import Paragraph, Spacer, Table
+    
+    template = _load_template()
+    table = Table(rows, colWidths=template["col_widths"])
+    table.setStyle(template["table_style"])
+    return [Paragraph("SHIPMENT INVOICE", template["title_style"]), Spacer(1, 12), table]
+
+def render_invoices(invoices: Sequence[InvoiceRows]) -> bytes:
+    """Render one or more invoices into a single PDF, one page each"""
+    from reportlab.platypus import PageBreak, SimpleDocTemplate
+    
+    story = []
+    for rows in invoices:
+        if story:
+            story.append(PageBreak())
+        story.extend(_invoice_story(rows))
+    
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=_load_template()["pagesize"]).build(story)
+    return buffer.getvalue()
+
+def render_invoice(rows: InvoiceRows) -> bytes:
+    return render_invoices([rows])
+
+def render_each(invoices: Sequence[InvoiceRows]) -> List[bytes]:
+    return [render_invoice(rows) for rows in invoices]
+
+def merge_pdfs(documents: Sequence[bytes]) -> bytes:
+    writer = PdfWriter()
+    for document in documents:
+        writer.append(io.BytesIO(document))
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+def zip_invoices(documents: Sequence[Tuple[str, bytes]]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for filename, document in documents:
+            archive.writestr(filename, document)
+    return buffer.getvalue()
+
+class InvoiceRenderer:
+    """Renders invoices on a process pool so reportlab never runs on the event loop"""
+    
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn, not fork: the API process has threads (thread pools, import jobs)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_template
+            )
+        return self._executor
+    
+    async def _run(self, fn, *args):
+        """Run `fn` on the pool, replacing the pool and retrying once if a worker died"""
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # Concurrent calls share the broken pool; only the first one replaces it
+            if self._executor is executor:
+                self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            return await loop.run_in_executor(self.executor, fn, *args)
+    
+    async def render(self, rows: InvoiceRows) -> bytes:
+        return await self._run(render_invoice, rows)
+    
+    def _chunks(self, invoices: Sequence[InvoiceRows]) -> List[List[InvoiceRows]]:
+        # Enough chunks to keep every worker busy, but no more than one IPC round trip per chunk_size invoices
+        size = max(1, min(settings.invoice_batch_chunk_size, -(-len(invoices) // self.max_workers)))
+        return [list(invoices[start:start + size]) for start in range(0, len(invoices), size)]
+    
+    async def render_many(self, invoices: Sequence[InvoiceRows]) -> List[bytes]:
+        """One PDF per invoice, rendered in parallel chunks"""
+        parts = await asyncio.gather(*(self._run(render_each, chunk) for chunk in self._chunks(invoices)))
+        return [document for part in parts for document in part]
+    
+    async def render_merged(self, invoices: Sequence[InvoiceRows]) -> bytes:
+        """All invoices in one PDF; chunks render in parallel when pypdf is there to merge them"""
+        chunks = self._chunks(invoices)
+        if not PDF_MERGE_AVAILABLE or len(chunks) == 1:
+            return await self._run(render_invoices, list(invoices))
+        
+        parts = await asyncio.gather(*(self._run(render_invoices, chunk) for chunk in chunks))
+        return await self._run(merge_pdfs, parts)
+    
+    def warm(self) -> None:
+        """Start the workers so the first invoice doesn't pay for process startup and template loading"""
+        for _ in range(self.max_workers):
+            self.executor.submit(_load_template)
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+invoice_renderer = InvoiceRenderer(settings.invoice_workers)
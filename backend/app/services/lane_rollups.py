@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import LaneStat, Shipment as ShipmentModel, Transporter as TransporterModel
+from app.services.response_cache import mark_written
+
+logger = logging.getLogger(__name__)
+
+LaneKey = Tuple[str, str, str]
+
+# Columns /analytics/routes can sort by; each is indexed on lane_stats
+SORTABLE_COLUMNS = {
+    "volume": LaneStat.volume,
+    "on_time_percentage": LaneStat.on_time_percentage,
+    "avg_distance": LaneStat.avg_distance,
+    "avg_duration": LaneStat.avg_duration,
+    "avg_cost": LaneStat.avg_cost,
+    "total_cost": LaneStat.total_cost
+}
+
+_LANE_ATTRS = ("origin", "destination", "transport_mode")
+
+# Fields of each lane returned by /analytics/routes, in export column order
+LANE_FIELDS = _LANE_ATTRS + ("volume", "on_time_percentage", "avg_distance", "avg_duration", "avg_cost", "total_cost")
+
+def _lane_aggregates():
+    """Select list computing one lane_stats row per (origin, destination, transport_mode)"""
+    completed = func.count(ShipmentModel.actual_eta)
+    on_time = func.sum(case((ShipmentModel.actual_eta <= ShipmentModel.estimated_eta, 1), else_=0))
+    cost = ShipmentModel.route_distance / 1000.0 * func.coalesce(TransporterModel.base_rate, 0.0)
+    return (
+        select(
+            ShipmentModel.origin,
+            ShipmentModel.destination,
+            func.coalesce(ShipmentModel.transport_mode, "road"),
+            func.count(ShipmentModel.id),
+            completed,
+            func.coalesce(on_time, 0),
+            func.coalesce(func.avg(ShipmentModel.route_distance), 0.0),
+            func.coalesce(func.avg(ShipmentModel.route_duration), 0.0),
+            func.coalesce(func.sum(cost), 0.0)
+        )
+        .outerjoin(TransporterModel, TransporterModel.id == ShipmentModel.transporter_id)
+        .group_by(ShipmentModel.origin, ShipmentModel.destination, func.coalesce(ShipmentModel.transport_mode, "road"))
+    )
+
+def _lane_row(row) -> Dict:
+    origin, destination, mode, volume, completed, on_time, avg_distance, avg_duration, total_cost = row
+    return {
+        "origin": origin,
+        "destination": destination,
+        "transport_mode": mode,
+        "volume": volume,
+        "completed_count": completed,
+        "on_time_count": on_time,
+        "on_time_percentage": round(on_time / completed * 100, 1) if completed else None,
+        "avg_distance": avg_distance,
+        "avg_duration": avg_duration,
+        "total_cost": total_cost,
+        "avg_cost": total_cost / volume if volume else 0.0
+    }
+
+def _lane_filter(lanes: List[LaneKey], origin, destination, mode):
+    return or_(*[and_(origin == o, destination == d, mode == m) for o, d, m in lanes])
+
+def refresh_lanes(db: Session, lanes: Iterable[LaneKey]) -> int:
+    """Recompute the given lanes from shipments; lanes with no shipments left are dropped"""
+    lanes = list(lanes)
+    table = LaneStat.__table__
+    for start in range(0, len(lanes), settings.lane_rollup_batch_size):
+        batch = lanes[start:start + settings.lane_rollup_batch_size]
+        mode = func.coalesce(ShipmentModel.transport_mode, "road")
+        rows = db.execute(
+            _lane_aggregates().where(_lane_filter(batch, ShipmentModel.origin, ShipmentModel.destination, mode))
+        ).all()
+        db.execute(delete(table).where(_lane_filter(batch, table.c.origin, table.c.destination, table.c.transport_mode)))
+        if rows:
+            db.execute(insert(table), [_lane_row(row) for row in rows])
+    mark_written(db, table.name)
+    db.commit()
+    return len(lanes)
+
+def rebuild_lane_stats(db: Session) -> int:
+    """Recompute every lane in one pass"""
+    rows = db.execute(_lane_aggregates()).all()
+    db.execute(delete(LaneStat.__table__))
+    if rows:
+        db.execute(insert(LaneStat.__table__), [_lane_row(row) for row in rows])
+    mark_written(db, LaneStat.__tablename__)
+    db.commit()
+    logger.info("Rebuilt lane_stats: %d lanes", len(rows))
+    return len(rows)
+
+def ensure_lane_stats(db: Session) -> None:
+    """Backfill the rollup table once for databases that predate it"""
+    has_stats = db.execute(select(LaneStat.origin).limit(1)).first() is not None
+    has_shipments = db.execute(select(ShipmentModel.id).limit(1)).first() is not None
+    if has_shipments and not has_stats:
+        rebuild_lane_stats(db)
+
+class LaneRollupAggregator:
+    """Collects lanes touched by committed shipment changes and refreshes them on an interval"""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._dirty: Set[LaneKey] = set()
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+    
+    def mark_dirty(self, lanes: Iterable[LaneKey]) -> None:
+        with self._lock:
+            self._dirty.update(lanes)
+    
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+    
+    def flush(self) -> int:
+        """Refresh every lane marked so far; safe to call from any thread"""
+        with self._lock:
+            lanes, self._dirty = self._dirty, set()
+        if not lanes:
+            return 0
+        
+        db = SessionLocal()
+        try:
+            return refresh_lanes(db, lanes)
+        except Exception:
+            db.rollback()
+            # Put them back so the next pass retries
+            self.mark_dirty(lanes)
+            raise
+        finally:
+            db.close()
+    
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        # Don't lose changes made since the last pass
+        await asyncio.to_thread(self.flush)
+    
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                refreshed = await asyncio.to_thread(self.flush)
+                if refreshed:
+                    logger.debug("Refreshed %d lanes", refreshed)
+            except Exception:
+                logger.exception("Lane rollup refresh failed")
+
+lane_aggregator = LaneRollupAggregator(settings.lane_rollup_interval)
+
+def _lane_of(values) -> LaneKey:
+    origin, destination, mode = values
+    return origin, destination, mode or "road"
+
+@event.listens_for(Session, "before_flush")
+def _load_lane_attrs(session: Session, flush_context, instances) -> None:
+    # Expired attributes have no history, so load them while the old row still exists
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, ShipmentModel):
+            for attr in _LANE_ATTRS:
+                getattr(obj, attr)
+
+@event.listens_for(Session, "after_flush")
+def _collect_dirty_lanes(session: Session, flush_context) -> None:
+    """Remember which lanes this transaction touched; they're handed over on commit"""
+    lanes = session.info.setdefault("dirty_lanes", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, ShipmentModel):
+            continue
+        state = inspect(obj)
+        lanes.add(_lane_of(obj.__dict__.get(attr) for attr in _LANE_ATTRS))
+        if not state.pending:
+            # The lane it was on before this flush, in case origin/destination/mode changed
+            previous = []
+            for attr in _LANE_ATTRS:
+                history = state.attrs[attr].history
+                previous.append(history.deleted[0] if history.deleted else obj.__dict__.get(attr))
+            lanes.add(_lane_of(previous))
+
+@event.listens_for(Session, "after_commit")
+def _hand_over_dirty_lanes(session: Session) -> None:
+    lanes = session.info.pop("dirty_lanes", None)
+    if lanes:
+        lane_aggregator.mark_dirty(lanes)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_dirty_lanes(session: Session) -> None:
+    session.info.pop("dirty_lanes", None)
+
+def lane_as_dict(lane: LaneStat) -> Dict:
+    return {field: getattr(lane, field) for field in LANE_FIELDS}
+
+def top_lanes(db: Session, sort_by: str = "volume", order: str = "desc", limit: Optional[int] = None) -> List[Dict]:
+    """Lanes ordered by an indexed rollup column, so top-N is an index scan"""
+    column = SORTABLE_COLUMNS.get(sort_by, LaneStat.volume)
+    ordering = column.desc() if order == "desc" else column.asc()
+    query = db.query(LaneStat).order_by(ordering, LaneStat.origin, LaneStat.destination, LaneStat.transport_mode)
+    if limit:
+        query = query.limit(limit)
+    return [dict(lane_as_dict(lane), id=rank) for rank, lane in enumerate(query, start=1)]
+
+def lane_totals(db: Session) -> Dict:
+    """Network-wide figures summed over the rollups"""
+    lanes, volume, completed, on_time, cost = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(LaneStat.volume), 0),
+            func.coalesce(func.sum(LaneStat.completed_count), 0),
+            func.coalesce(func.sum(LaneStat.on_time_count), 0),
+            func.coalesce(func.sum(LaneStat.total_cost), 0.0)
+        )
+    ).one()
+    return {
+        "lanes": lanes,
+        "total_shipments": volume,
+        "on_time_delivery_rate": round(on_time / completed * 100, 1) if completed else None,
+        "total_cost": cost
+    }
+
+def volume_by_mode(db: Session) -> Dict[str, int]:
+    rows = db.execute(
+        select(LaneStat.transport_mode, func.sum(LaneStat.volume)).group_by(LaneStat.transport_mode)
+    ).all()
+    return {mode: volume for mode, volume in rows}
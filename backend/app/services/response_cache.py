@@ -0,0 +1,185 @@
+import hashlib
+import re
+import threading
+import time
+from email.utils import formatdate
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.services.cache import MISSING, SingleFlight, TTLCache
+
+class CacheRule(NamedTuple):
+    pattern: "re.Pattern"
+    ttl: float  # seconds; a safety net for writes this process can't see
+    tables: Tuple[str, ...]  # writes to any of these invalidate the cached response
+
+_ENTITY_TABLES = ("clients", "products", "drivers", "transporters")
+
+# Read-heavy GET endpoints polled by the frontend
+CACHE_RULES = [
+    CacheRule(re.compile(r"^/dashboard/summary$"), 10, ("shipments", "shipment_daily_stats")),
+    # Chart series are shipment data; listed so they invalidate on writes once backed by it, not after the TTL
+    CacheRule(re.compile(r"^/dashboard/charts/[^/]+$"), 60, ("shipments", "shipment_daily_stats")),
+    CacheRule(re.compile(r"^/analytics/metrics$"), 10, ("lane_stats",)),
+    CacheRule(re.compile(r"^/analytics/routes$"), 10, ("lane_stats",)),
+    CacheRule(re.compile(r"^/shipments/?$"), 30, ("shipments",) + _ENTITY_TABLES),
+] + [
+    CacheRule(re.compile(rf"^/{table}/?$"), 30, (table,)) for table in _ENTITY_TABLES
+]
+
+# Response headers replayed from the cache; everything else is regenerated
+_REPLAYED_HEADERS = {b"content-type", b"x-next-cursor", b"content-disposition"}
+
+class TableVersions:
+    """Per-table write counters, bumped when a transaction that wrote to the table commits"""
+    
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._modified: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._started = time.time()
+    
+    def bump(self, tables: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._modified[table] = now
+    
+    def snapshot(self, tables: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(table, 0) for table in tables)
+    
+    def last_modified(self, tables: Tuple[str, ...]) -> float:
+        # Tables untouched since startup count as modified at startup
+        return max((self._modified.get(table, self._started) for table in tables), default=self._started)
+
+table_versions = TableVersions()
+
+def mark_written(session: Session, *tables: str) -> None:
+    """Record writes the ORM can't see (Core or raw SQL) so they invalidate cached responses on commit"""
+    session.info.setdefault("written_tables", set()).update(tables)
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_tables(session: Session, flush_context) -> None:
+    tables = {obj.__table__.name for obj in list(session.new) + list(session.dirty) + list(session.deleted)}
+    if tables:
+        mark_written(session, *tables)
+
+@event.listens_for(Session, "after_commit")
+def _bump_written_tables(session: Session) -> None:
+    tables = session.info.pop("written_tables", None)
+    if tables:
+        table_versions.bump(tables)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_written_tables(session: Session) -> None:
+    session.info.pop("written_tables", None)
+
+class CachedResponse:
+    __slots__ = ("status", "headers", "body", "etag", "last_modified", "versions")
+    
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, last_modified: float, versions: Tuple[int, ...]):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.last_modified = last_modified
+        self.versions = versions
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return "*" in candidates or etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+class ResponseCacheMiddleware:
+    """Shared cache for read-heavy GET endpoints, with ETag revalidation.
+    
+    Entries are keyed by path and query string and dropped as soon as one of the
+    rule's tables has a committed write. Concurrent misses for the same table
+    versions render once. Only If-None-Match can produce a 304: Last-Modified has
+    one-second precision, too coarse to notice writes within the same second.
+    """
+    
+    def __init__(self, app, rules: List[CacheRule] = CACHE_RULES, maxsize: Optional[int] = None):
+        self.app = app
+        self.rules = rules
+        self.cache = TTLCache(maxsize or settings.response_cache_size, ttl=60)
+        self._flight = SingleFlight()
+        self.not_modified = 0
+    
+    async def __call__(self, scope, receive, send):
+        rule = self._match(scope) if settings.response_cache_enabled else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+        
+        query = urlencode(sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)))
+        key = (scope["path"], query)
+        versions = table_versions.snapshot(rule.tables)
+        
+        entry = self.cache.get(key)
+        hit = entry is not MISSING and entry.versions == versions
+        if not hit:
+            # A miss after a write must not join a render that started before it
+            entry = await self._flight.do((key, versions), lambda: self._render(scope, receive, rule, key, versions))
+        await self._respond(scope, entry, hit, send)
+    
+    def _match(self, scope) -> Optional[CacheRule]:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return None
+        for rule in self.rules:
+            if rule.pattern.match(scope["path"]):
+                return rule
+        return None
+    
+    async def _render(self, scope, receive, rule: CacheRule, key, versions: Tuple[int, ...]) -> CachedResponse:
+        """Run the endpoint with a capturing `send`, caching successful responses"""
+        last_modified = table_versions.last_modified(rule.tables) if rule.tables else time.time()
+        start = {}
+        body = []
+        
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+        
+        await self.app(scope, receive, capture)
+        status = start.get("status", 500)
+        headers = [
+            (name, value) for name, value in start.get("headers", [])
+            # Uncached responses (errors, redirects) are passed through with everything but the length
+            if (name.lower() in _REPLAYED_HEADERS if status == 200 else name.lower() != b"content-length")
+        ]
+        entry = CachedResponse(status, headers, b"".join(body), last_modified, versions)
+        if entry.status == 200:
+            self.cache.set(key, entry, ttl=rule.ttl)
+        return entry
+    
+    async def _respond(self, scope, entry: CachedResponse, hit: bool, send) -> None:
+        request_headers = {name.lower(): value.decode("latin-1") for name, value in scope.get("headers", [])}
+        validators = [
+            (b"etag", entry.etag.encode()),
+            (b"last-modified", formatdate(entry.last_modified, usegmt=True).encode()),
+            (b"cache-control", b"no-cache"),
+            (b"x-cache", b"HIT" if hit else b"MISS")
+        ]
+        
+        if entry.status == 200:
+            if_none_match = request_headers.get(b"if-none-match")
+            if if_none_match is not None and _etag_matches(if_none_match, entry.etag):
+                self.not_modified += 1
+                await send({"type": "http.response.start", "status": 304, "headers": validators})
+                await send({"type": "http.response.body", "body": b""})
+                return
+        else:
+            validators = []
+        
+        headers = entry.headers + [(b"content-length", str(len(entry.body)).encode())] + validators
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+    
+    def stats(self) -> Dict:
+        return dict(self.cache.stats(), not_modified=self.not_modified, collapsed=self._flight.collapsed)
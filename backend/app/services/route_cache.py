@@ -0,0 +1,59 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Tuple
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import RouteCacheEntry
+from app.services.cache import MISSING, TieredCache
+from app.services.geocode_cache import normalize_address
+
+RouteKey = Tuple[str, str, str]  # origin, destination, profile
+
+class RouteCache(TieredCache):
+    """Route cache keyed by normalized (origin, destination, profile), backed by the `route_cache` table"""
+    
+    def __init__(self, session_factory=SessionLocal):
+        super().__init__(settings.route_cache_size, settings.route_cache_ttl, session_factory)
+    
+    @staticmethod
+    def make_key(origin: str, destination: str, profile: str) -> RouteKey:
+        return (normalize_address(origin), normalize_address(destination), profile)
+    
+    def _read_persisted(self, key: RouteKey):
+        db = self.session_factory()
+        try:
+            entry = db.get(RouteCacheEntry, key)
+            if entry is None:
+                return MISSING
+            
+            ttl = self._remaining_ttl(entry.expires_at)
+            if ttl <= 0:
+                return MISSING
+            
+            return {
+                "distance": entry.distance,
+                "duration": entry.duration,
+                "geometry": json.loads(entry.geometry) if entry.geometry else None
+            }, ttl
+        finally:
+            db.close()
+    
+    def _write_persisted(self, key: RouteKey, route: Dict[str, Any], ttl: float) -> None:
+        origin_key, destination_key, profile = key
+        db = self.session_factory()
+        try:
+            db.merge(RouteCacheEntry(
+                origin_key=origin_key,
+                destination_key=destination_key,
+                profile=profile,
+                distance=route["distance"],
+                duration=route["duration"],
+                geometry=json.dumps(route["geometry"]) if route["geometry"] is not None else None,
+                expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl)
+            ))
+            db.commit()
+        except Exception:
+            # The persistent tier is best effort; the in-memory entry still serves
+            db.rollback()
+        finally:
+            db.close()
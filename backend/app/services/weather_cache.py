@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
+from app.core.config import settings
+from app.services.cache import MISSING, SingleFlight, TTLCache
+
+Cell = Tuple[float, float]  # lat, lon rounded to the cell precision
+
+class WeatherCache:
+    """Weather delay factors cached per coarse geo cell and time bucket.
+    
+    An entry is fresh until the end of the time bucket it was fetched in. After
+    that it is served stale for a grace period while one background refresh runs.
+    """
+    
+    def __init__(self):
+        self.memory = TTLCache(
+            settings.weather_cache_size,
+            settings.weather_bucket_seconds + settings.weather_stale_seconds
+        )
+        self._flight = SingleFlight()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self.stale_hits = 0
+        self.upstream_calls = 0
+    
+    @staticmethod
+    def cell_for(lat: float, lon: float) -> Cell:
+        precision = settings.weather_cell_precision
+        return (round(lat, precision), round(lon, precision))
+    
+    async def get_or_fetch(
+        self,
+        lat: float,
+        lon: float,
+        fetch: Callable[[float, float], Awaitable[float]]
+    ) -> float:
+        """Return the delay factor for the cell containing (lat, lon).
+        
+        `fetch` is called with the cell's coordinates so every location in a
+        cell shares one upstream request.
+        """
+        cell = self.cell_for(lat, lon)
+        cached = self.memory.get(cell)
+        if cached is not MISSING:
+            factor, fresh_until = cached
+            if time.time() >= fresh_until:
+                self.stale_hits += 1
+                self._refresh_in_background(cell, fetch)
+            return factor
+        return await self._flight.do(cell, lambda: self._load(cell, fetch))
+    
+    async def _load(self, cell: Cell, fetch: Callable[[float, float], Awaitable[float]]) -> float:
+        self.upstream_calls += 1
+        factor = await fetch(*cell)
+        
+        now = time.time()
+        bucket = settings.weather_bucket_seconds
+        fresh_until = (now // bucket + 1) * bucket
+        self.memory.set(cell, (factor, fresh_until), ttl=fresh_until - now + settings.weather_stale_seconds)
+        return factor
+    
+    def _refresh_in_background(self, cell: Cell, fetch: Callable[[float, float], Awaitable[float]]) -> None:
+        async def refresh() -> None:
+            try:
+                await self._flight.do(cell, lambda: self._load(cell, fetch))
+            except Exception:
+                # Keep serving the stale value until its grace period runs out
+                pass
+        
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+    
+    def stats(self) -> Dict[str, Any]:
+        # Lookups answered without their own upstream call, including collapsed ones
+        lookups = self.memory.hits + self.memory.misses
+        return {
+            "hit_ratio": round(1 - self.upstream_calls / lookups, 4) if lookups else 0.0,
+            "memory": self.memory.stats(),
+            "stale_hits": self.stale_hits,
+            "upstream_calls": self.upstream_calls,
+            "collapsed_requests": self._flight.collapsed
+        }
@@ -0,0 +1,196 @@
+"""Tail latency of /health and /shipments/calculate-eta under a heavy write load: sync vs async sessions.
+
+Writer tasks hit an async write handler while a bulk-import thread keeps taking the
+SQLite write lock. The handler runs once with the old shape (sync Session calls inside
+`async def`, which stall the event loop while they wait on the lock) and once on
+AsyncSession. Requests go through the ASGI stack in-process. Run from the backend directory:
+
+    python -m benchmarks.bench_async_load --seconds 10 --writers 8 --probes 8 --rate 50 --batch 2000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, get_async_db, get_db
+from app.models import Client as ClientModel, Driver as DriverModel, Product as ProductModel, Shipment as ShipmentModel
+from app.services.eta_service import eta_service
+from benchmarks.stub_server import run_stub_server
+from main import app
+
+STATUSES = ("pending", "in_transit", "delivered", "delayed")
+
+bench_router = APIRouter()
+
+@bench_router.post("/bench/blocking-write/{shipment_id}")
+async def blocking_write(shipment_id: int, db: Session = Depends(get_db)):
+    # The handler shape before AsyncSession: every query and the commit run on the event loop
+    shipment = db.query(ShipmentModel).filter(ShipmentModel.id == shipment_id).first()
+    if shipment is None:
+        raise HTTPException(status_code=404, detail="Shipment not found")
+    shipment.status = STATUSES[(STATUSES.index(shipment.status) + 1) % len(STATUSES)]
+    db.commit()
+    return {"status": shipment.status}
+
+@bench_router.post("/bench/async-write/{shipment_id}")
+async def async_write(shipment_id: int, db: AsyncSession = Depends(get_async_db)):
+    shipment = await db.get(ShipmentModel, shipment_id)
+    if shipment is None:
+        raise HTTPException(status_code=404, detail="Shipment not found")
+    shipment.status = STATUSES[(STATUSES.index(shipment.status) + 1) % len(STATUSES)]
+    await db.commit()
+    return {"status": shipment.status}
+
+app.include_router(bench_router)
+
+def _rows(start: int, count: int):
+    now = datetime.utcnow()
+    return [
+        {
+            "client_id": 1, "product_id": 1, "driver_id": 1, "transporter_id": 1,
+            "origin": f"Depot {i % 50}", "destination": f"Store {i % 200}",
+            "estimated_eta": now + timedelta(days=2), "status": STATUSES[i % 4], "transport_mode": "road"
+        }
+        for i in range(start, start + count)
+    ]
+
+def _seed(shipments: int) -> None:
+    db = SessionLocal()
+    try:
+        db.add(ClientModel(name="Client", email="client@example.com", phone="555-0100", address="1 Main St", city="Cape Town", country="ZA"))
+        db.add(ProductModel(name="Crate", category="General", weight=10.0, dimensions="1x1x1", value=100.0))
+        db.add(DriverModel(
+            name="Driver", license_number="L-1", phone="555-0101", email="driver@example.com",
+            vehicle_type="Van", capacity=1000.0, current_location="Depot 0"
+        ))
+        db.commit()
+        db.execute(insert(ShipmentModel.__table__), _rows(0, shipments))
+        db.commit()
+    finally:
+        db.close()
+
+def _bulk_importer(stop: threading.Event, batch: int, pause: float) -> None:
+    """Commit shipment batches as a large upload does, parsing the next batch in `pause` seconds"""
+    start = 1_000_000
+    while not stop.wait(pause):
+        with engine.begin() as connection:
+            connection.execute(insert(ShipmentModel.__table__), _rows(start, batch))
+        start += batch
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def _summary(samples: list) -> str:
+    if not samples:
+        return f"{'-':>8} {'-':>8} {'-':>8}"
+    return f"{_percentile(samples, 50):8.2f} {_percentile(samples, 99):8.2f} {max(samples):8.2f}"
+
+async def _run(
+    label: str,
+    write_path: str,
+    seconds: float,
+    writers: int,
+    probes: int,
+    rate: float,
+    shipments: int,
+    batch: int,
+    pause: float
+) -> None:
+    latencies = {"/health": [], "/shipments/calculate-eta": []}
+    writes = []
+    failed_writes = 0
+    interval = 1 / rate
+    deadline = time.perf_counter() + seconds
+    
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=60) as api:
+        async def probe(i: int) -> None:
+            # Fixed schedule, timed from when each request was due, so a stalled loop counts against it
+            due = time.perf_counter() + i * interval / probes
+            n = i
+            while due < deadline:
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                if n % 2:
+                    path = "/shipments/calculate-eta"
+                    response = await api.post(path, json={"origin": f"Depot {n % 50}", "destination": f"Store {n % 200}"})
+                else:
+                    path = "/health"
+                    response = await api.get(path)
+                latencies[path].append((time.perf_counter() - due) * 1000)
+                response.raise_for_status()
+                n += probes
+                due += interval
+        
+        async def writer(i: int) -> None:
+            nonlocal failed_writes
+            n = i
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await api.post(write_path.format(1 + n % shipments))
+                if response.is_success:
+                    writes.append((time.perf_counter() - started) * 1000)
+                else:
+                    # e.g. "database is locked" once a writer waits out the busy timeout
+                    failed_writes += 1
+                n += writers
+        
+        stop = threading.Event()
+        importer = threading.Thread(target=_bulk_importer, args=(stop, batch, pause), daemon=True) if batch else None
+        if importer:
+            importer.start()
+        try:
+            await asyncio.gather(*(probe(i) for i in range(probes)), *(writer(i) for i in range(writers)))
+        finally:
+            stop.set()
+            if importer:
+                await asyncio.to_thread(importer.join)
+    
+    print(f"{label}")
+    for path, samples in latencies.items():
+        print(f"  {path:<28} {_summary(samples)}  ({len(samples)} requests)")
+    print(f"  {'writes':<28} {_summary(writes)}  ({len(writes) / seconds:.1f} writes/s, {failed_writes} failed)")
+
+async def main(seconds: float, writers: int, probes: int, rate: float, shipments: int, batch: int, pause: float) -> None:
+    _seed(shipments)
+    with run_stub_server() as (ors_url, owm_url):
+        settings.openrouteservice_api_key = "bench"
+        settings.openweather_api_key = "bench"
+        eta_service.openrouteservice_url = ors_url
+        eta_service.openweather_url = owm_url
+        
+        # Fill the route cache first so every run probes the same warm path
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as api:
+            await asyncio.gather(*(
+                api.post("/shipments/calculate-eta", json={"origin": f"Depot {n % 50}", "destination": f"Store {n % 200}"})
+                for n in range(200)
+            ))
+        
+        print(f"{'':<30} {'p50':>8} {'p99':>8} {'max':>8}  (ms)")
+        await _run("no writes", "", seconds, 0, probes, rate, shipments, 0, 0.0)
+        await _run("sync Session in async handler", "/bench/blocking-write/{}", seconds, writers, probes, rate, shipments, batch, pause)
+        await _run("AsyncSession", "/bench/async-write/{}", seconds, writers, probes, rate, shipments, batch, pause)
+        await eta_service.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--probes", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=50.0, help="Requests per second sent by each probe")
+    parser.add_argument("--shipments", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=2000, help="Rows per bulk-import transaction; 0 disables the importer")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds between bulk-import transactions")
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds, args.writers, args.probes, args.rate, args.shipments, args.batch, args.pause))
@@ -0,0 +1,62 @@
+"""Upstream calls and wall time for POST /shipments/calculate-eta/batch with and without matrix mode.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_batch_eta --origins 20 --destinations 250
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx
+from app.core.config import settings
+from app.services.eta_service import ETAService
+from app.api import shipments
+from app.services.cache import MISSING
+from benchmarks.stub_server import run_stub_server, stub_app
+from main import app
+
+async def _run(label: str, items: list, ors_url: str, owm_url: str, matrix: bool) -> None:
+    # Fresh service per run so neither run benefits from the other's caches
+    service = ETAService()
+    service.openrouteservice_url = ors_url
+    service.openweather_url = owm_url
+    service.route_cache._read_persisted = lambda key: MISSING
+    service.geocode_cache._read_persisted = lambda key: MISSING
+    shipments.eta_service = service
+    settings.ors_matrix_enabled = matrix
+    stub_app.state.calls = {}
+    
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=None) as api:
+        started = time.perf_counter()
+        response = await api.post("/shipments/calculate-eta/batch", json={"items": items})
+        lines = response.text.splitlines()
+        elapsed = time.perf_counter() - started
+    await service.shutdown()
+    
+    calls = ", ".join(f"{name}={count}" for name, count in sorted(stub_app.state.calls.items()))
+    print(f"{label:<16} {len(lines)} results in {elapsed:6.2f}s  upstream: {calls}")
+
+async def main(origins: int, destinations: int, latency: float) -> None:
+    items = [
+        {"origin": f"Depot {o}", "destination": f"Store {d}"}
+        for o in range(origins) for d in range(destinations)
+    ]
+    with run_stub_server(latency=latency) as (ors_url, owm_url):
+        settings.openrouteservice_api_key = "bench"
+        settings.openweather_api_key = "bench"
+        await _run("directions only", items, ors_url, owm_url, matrix=False)
+        await _run("matrix mode", items, ors_url, owm_url, matrix=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--origins", type=int, default=20)
+    parser.add_argument("--destinations", type=int, default=250)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated upstream latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.origins, args.destinations, args.latency))
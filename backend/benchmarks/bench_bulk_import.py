@@ -0,0 +1,96 @@
+"""Product CSV import throughput: bulk executemany path vs the old iterrows + ORM add loop.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_bulk_import --rows 1000000 --legacy-rows 100000
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_DIR}/bench.db")
+
+import pandas as pd
+from app.core.database import SessionLocal, engine
+from app.models import Base, Product as ProductModel
+from app.services.importer import IMPORT_SPECS, import_chunks, read_csv_chunks
+
+# Minimum rows/s the bulk path should sustain on a developer laptop
+TARGET_ROWS_PER_SECOND = 100_000
+
+def _write_csv(path: str, rows: int) -> None:
+    with open(path, "w") as f:
+        f.write("name,category,weight,dimensions,value\n")
+        for i in range(rows):
+            f.write(f"Product {i},Category {i % 50},{1 + i % 900}.5,{i % 9 + 1}x{i % 7 + 1}x{i % 5 + 1},{10 + i % 1000}.99\n")
+
+def _reset() -> None:
+    Base.metadata.drop_all(bind=engine, tables=[ProductModel.__table__])
+    Base.metadata.create_all(bind=engine, tables=[ProductModel.__table__])
+
+def _bulk(path: str, chunk_size: int) -> int:
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as f:
+            chunks = read_csv_chunks(f, IMPORT_SPECS["products"].required_columns, chunk_size)
+            return import_chunks(db, IMPORT_SPECS["products"], chunks).created
+    finally:
+        db.close()
+
+def _legacy(path: str) -> int:
+    # The pre-bulk upload handler: whole file in memory, one ORM object per row
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as f:
+            df = pd.read_csv(pd.io.common.StringIO(f.read().decode("utf-8")))
+        created = 0
+        for _, row in df.iterrows():
+            db.add(ProductModel(
+                name=str(row['name']),
+                category=str(row['category']),
+                weight=float(row['weight']),
+                dimensions=str(row['dimensions']),
+                value=float(row['value'])
+            ))
+            created += 1
+        db.commit()
+        return created
+    finally:
+        db.close()
+
+def _report(label: str, rows: int, elapsed: float) -> float:
+    rate = rows / elapsed
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{label:<8} {rows:>9} rows in {elapsed:7.2f}s  {rate:>10,.0f} rows/s  peak RSS so far {peak_mb:7.1f} MB")
+    return rate
+
+def main(rows: int, legacy_rows: int, chunk_size: int) -> None:
+    bulk_csv = os.path.join(DB_DIR, "products.csv")
+    _write_csv(bulk_csv, rows)
+    
+    # Bulk first so the peak RSS figure isn't inflated by the legacy run
+    _reset()
+    started = time.perf_counter()
+    created = _bulk(bulk_csv, chunk_size)
+    rate = _report("bulk", created, time.perf_counter() - started)
+    
+    if legacy_rows:
+        legacy_csv = os.path.join(DB_DIR, "products_legacy.csv")
+        _write_csv(legacy_csv, legacy_rows)
+        _reset()
+        started = time.perf_counter()
+        _report("legacy", _legacy(legacy_csv), time.perf_counter() - started)
+    
+    verdict = "meets" if rate >= TARGET_ROWS_PER_SECOND else "MISSES"
+    print(f"bulk path {verdict} the {TARGET_ROWS_PER_SECOND:,} rows/s target")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.rows, args.legacy_rows, args.chunk_size)
@@ -0,0 +1,97 @@
+"""Latency of POST /shipments/calculate-eta with and without the shared HTTP client.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_calculate_eta --requests 500 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+import httpx
+from sqlalchemy import delete
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import GeocodeCacheEntry, RouteCacheEntry
+from app.services.eta_service import eta_service
+from benchmarks.stub_server import run_stub_server, stub_app
+from main import app
+
+async def _unpooled_request(method: str, url: str, **kwargs) -> httpx.Response:
+    # Previous behaviour: a brand new client (and connection) for every upstream call
+    async with httpx.AsyncClient() as client:
+        return await client.request(method, url, **kwargs)
+
+def _reset_caches() -> None:
+    """Empty every ETA cache tier so each run makes the same upstream calls"""
+    for cache in (eta_service.geocode_cache, eta_service.route_cache, eta_service.weather_cache):
+        cache.memory.clear()
+    eta_service.prediction_cache.clear()
+    db = SessionLocal()
+    try:
+        db.execute(delete(GeocodeCacheEntry))
+        db.execute(delete(RouteCacheEntry))
+        db.commit()
+    finally:
+        db.close()
+    stub_app.state.calls = {}
+
+def _percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def _run(label: str, requests: int, concurrency: int) -> None:
+    _reset_caches()
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as api:
+        async def one(i: int) -> None:
+            payload = {"origin": f"Depot {i % 50}", "destination": f"Store {i % 200}"}
+            async with semaphore:
+                start = time.perf_counter()
+                response = await api.post("/shipments/calculate-eta", json=payload)
+                latencies.append((time.perf_counter() - start) * 1000)
+                response.raise_for_status()
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+    
+    print(
+        f"{label:<22} p50={_percentile(latencies, 50):7.2f} ms  "
+        f"p99={_percentile(latencies, 99):7.2f} ms  "
+        f"mean={statistics.mean(latencies):7.2f} ms  "
+        f"throughput={requests / elapsed:8.1f} req/s  "
+        f"upstream={dict(sorted(stub_app.state.calls.items()))}"
+    )
+
+async def main(requests: int, concurrency: int, latency: float) -> None:
+    with run_stub_server(latency=latency) as (ors_url, owm_url):
+        settings.openrouteservice_api_key = "bench"
+        settings.openweather_api_key = "bench"
+        eta_service.openrouteservice_url = ors_url
+        eta_service.openweather_url = owm_url
+        
+        eta_service._request = _unpooled_request
+        await _run("client per call", requests, concurrency)
+        
+        del eta_service._request
+        await _run("shared pooled client", requests, concurrency)
+        await eta_service.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated upstream latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.latency))
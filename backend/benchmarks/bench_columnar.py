@@ -0,0 +1,120 @@
+"""CSV vs Parquet vs Arrow IPC: product import and shipment export throughput and memory.
+
+Each measurement runs in a fresh process so its peak RSS isn't inflated by earlier runs.
+Run from the backend directory:
+
+    python -m benchmarks.bench_columnar --rows 1000000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_DIR}/bench.db")
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.core.database import SessionLocal, engine
+from app.models import Base, Product as ProductModel, Shipment as ShipmentModel
+from app.services.exporter import export_shipments
+from app.services.importer import IMPORT_SPECS, bulk_insert, import_chunks, read_file_chunks
+
+def _product_table(rows: int) -> pa.Table:
+    return pa.table({
+        "name": [f"Product {i}" for i in range(rows)],
+        "category": [f"Category {i % 50}" for i in range(rows)],
+        "weight": [1.5 + i % 900 for i in range(rows)],
+        "dimensions": [f"{i % 9 + 1}x{i % 7 + 1}x{i % 5 + 1}" for i in range(rows)],
+        "value": [10.99 + i % 1000 for i in range(rows)]
+    })
+
+def _write_inputs(rows: int) -> dict:
+    table = _product_table(rows)
+    paths = {fmt: os.path.join(DB_DIR, f"products.{fmt}") for fmt in ("csv", "parquet", "arrow")}
+    table.to_pandas().to_csv(paths["csv"], index=False)
+    pq.write_table(table, paths["parquet"], row_group_size=100_000)
+    with pa.OSFile(paths["arrow"], "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=100_000)
+    return paths
+
+def _seed_shipments(rows: int) -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        start = datetime(2026, 1, 1)
+        names = ["client_id", "product_id", "driver_id", "transporter_id", "origin", "destination", "estimated_eta", "status", "transport_mode"]
+        for offset in range(0, rows, 100_000):
+            batch = [
+                (1 + i % 100, 1 + i % 500, 1 + i % 50, 1 + i % 20, f"City {i % 40}", f"City {(i * 7) % 40}",
+                 start + timedelta(minutes=i), ("pending", "in_transit", "delivered", "delayed")[i % 4], "road")
+                for i in range(offset, min(rows, offset + 100_000))
+            ]
+            bulk_insert(db, ShipmentModel.__table__, names, batch)
+            db.commit()
+    finally:
+        db.close()
+
+def _import(file_format: str, path: str, chunk_size: int) -> int:
+    Base.metadata.drop_all(bind=engine, tables=[ProductModel.__table__])
+    Base.metadata.create_all(bind=engine, tables=[ProductModel.__table__])
+    spec = IMPORT_SPECS["products"]
+    db = SessionLocal()
+    try:
+        chunks = read_file_chunks(path, file_format, spec.required_columns, chunk_size)
+        return import_chunks(db, spec, chunks).created
+    finally:
+        db.close()
+
+def _export(file_format: str, batch_size: int) -> int:
+    return sum(len(part) for part in export_shipments(file_format, batch_size))
+
+def _peak_rss_mb() -> float:
+    # VmHWM starts fresh in each exec'd process, unlike ru_maxrss which survives exec
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def _measure(task: str, args: tuple, queue) -> None:
+    started = time.perf_counter()
+    if task == "import":
+        result = _import(*args)
+    else:
+        result = _export(*args)
+    elapsed = time.perf_counter() - started
+    queue.put((result, elapsed, _peak_rss_mb()))
+
+def _run(task: str, *args):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(task, args, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def main(rows: int, chunk_size: int, batch_size: int) -> None:
+    paths = _write_inputs(rows)
+    print(f"ingest {rows:,} products")
+    for file_format, path in paths.items():
+        created, elapsed, peak_mb = _run("import", file_format, path, chunk_size)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"  {file_format:<8} {created / elapsed:>10,.0f} rows/s  {elapsed:6.2f}s  file {size_mb:7.1f} MB  peak RSS {peak_mb:7.1f} MB")
+    
+    _seed_shipments(rows)
+    print(f"export {rows:,} shipments")
+    for file_format in ("csv", "parquet"):
+        size, elapsed, peak_mb = _run("export", file_format, batch_size)
+        print(f"  {file_format:<8} {rows / elapsed:>10,.0f} rows/s  {elapsed:6.2f}s  body {size / 1024 / 1024:7.1f} MB  peak RSS {peak_mb:7.1f} MB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+    main(args.rows, args.chunk_size, args.batch_size)
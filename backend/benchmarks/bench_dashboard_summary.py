@@ -0,0 +1,87 @@
+"""Dashboard summary latency: daily aggregate table vs COUNT ... GROUP BY over all shipments.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_dashboard_summary --rows 1000000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_DIR}/bench.db")
+
+from sqlalchemy import func, select
+from app.core.database import SessionLocal, engine
+from app.models import Base, Shipment as ShipmentModel
+from app.services.dashboard_stats import TIMEFRAME_DAYS, dashboard_summary, rebuild_daily_stats
+from app.services.importer import bulk_insert
+
+STATUSES = ("pending", "in_transit", "delivered", "delayed")
+MODES = ("road", "air", "sea", "rail")
+
+def _seed(rows: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        names = ["client_id", "product_id", "driver_id", "transporter_id", "origin", "destination", "estimated_eta",
+                 "actual_eta", "status", "transport_mode", "created_at"]
+        for offset in range(0, rows, 100_000):
+            batch = []
+            for i in range(offset, min(rows, offset + 100_000)):
+                created = now - timedelta(minutes=(i * 37) % (365 * 24 * 60))
+                status = STATUSES[i % 4]
+                actual = created + timedelta(hours=24 + i % 300) if status == "delivered" else None
+                batch.append((1, 1, 1, 1, "A", "B", created + timedelta(days=3), actual, status, MODES[i % 4], created))
+            bulk_insert(db, ShipmentModel.__table__, names, batch)
+            db.commit()
+    finally:
+        db.close()
+
+def _naive_summary(db, timeframe: str) -> dict:
+    # What the endpoint would do without aggregates: scan shipments on every poll
+    since = datetime.utcnow() - timedelta(days=TIMEFRAME_DAYS[timeframe])
+    counts = dict(db.execute(
+        select(ShipmentModel.status, func.count())
+        .where(ShipmentModel.created_at >= since)
+        .group_by(ShipmentModel.status)
+    ).all())
+    avg_seconds = db.execute(
+        select(func.avg((func.julianday(ShipmentModel.actual_eta) - func.julianday(ShipmentModel.created_at)) * 86400))
+        .where(ShipmentModel.created_at >= since, ShipmentModel.status == "delivered")
+    ).scalar()
+    return {"total_shipments": sum(counts.values()), "avg_delivery_time": (avg_seconds or 0) / 86400}
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def main(rows: int, repeat: int) -> None:
+    _seed(rows)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        stat_rows = rebuild_daily_stats(db)
+        print(f"rebuilt {stat_rows} aggregate rows from {rows:,} shipments in {time.perf_counter() - started:.2f}s")
+        for timeframe in TIMEFRAME_DAYS:
+            aggregate_ms = _time(lambda: dashboard_summary(db, timeframe), repeat)
+            naive_ms = _time(lambda: _naive_summary(db, timeframe), repeat)
+            print(f"  {timeframe:<4} aggregates {aggregate_ms:8.2f} ms   full scan {naive_ms:8.2f} ms   x{naive_ms / aggregate_ms:,.0f}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
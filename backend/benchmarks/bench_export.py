@@ -0,0 +1,102 @@
+"""Shipment export: streaming CSV / NDJSON / XLSX writers vs the old string-concatenation CSV.
+
+Each measurement runs in a fresh process so its peak RSS isn't inflated by earlier runs.
+Run from the backend directory:
+
+    python -m benchmarks.bench_export --rows 1000000 --legacy-rows 100000
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_DIR}/bench.db")
+
+from app.core.database import SessionLocal, engine
+from app.models import Base, Shipment as ShipmentModel
+from app.services.exporter import SHIPMENT_EXPORT_COLUMNS, export_shipments
+from app.services.importer import bulk_insert
+
+def _seed_shipments(rows: int) -> None:
+    Base.metadata.drop_all(bind=engine, tables=[ShipmentModel.__table__])
+    Base.metadata.create_all(bind=engine, tables=[ShipmentModel.__table__])
+    db = SessionLocal()
+    try:
+        start = datetime(2026, 1, 1)
+        names = ["client_id", "product_id", "driver_id", "transporter_id", "origin", "destination", "estimated_eta", "status", "transport_mode"]
+        for offset in range(0, rows, 100_000):
+            batch = [
+                (1 + i % 100, 1 + i % 500, 1 + i % 50, 1 + i % 20, f"City {i % 40}, ZA", f"City {(i * 7) % 40}",
+                 start + timedelta(minutes=i), ("pending", "in_transit", "delivered", "delayed")[i % 4], "road")
+                for i in range(offset, min(rows, offset + 100_000))
+            ]
+            bulk_insert(db, ShipmentModel.__table__, names, batch)
+            db.commit()
+    finally:
+        db.close()
+
+def _legacy_csv() -> int:
+    # The old exporter: every row loaded, then csv_content += ... per row
+    db = SessionLocal()
+    try:
+        headers = [column.key for column in SHIPMENT_EXPORT_COLUMNS]
+        data = [dict(zip(headers, row)) for row in db.query(*SHIPMENT_EXPORT_COLUMNS).all()]
+    finally:
+        db.close()
+    csv_content = ",".join(headers) + "\n"
+    for row in data:
+        csv_content += ",".join(str(row.get(h, "")) for h in headers) + "\n"
+    return len(csv_content.encode())
+
+def _peak_rss_mb() -> float:
+    # VmHWM starts fresh in each exec'd process, unlike ru_maxrss which survives exec
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def _measure(file_format: str, batch_size: int, queue) -> None:
+    started = time.perf_counter()
+    if file_format == "legacy":
+        size = _legacy_csv()
+    else:
+        size = sum(len(part) for part in export_shipments(file_format, batch_size))
+    queue.put((size, time.perf_counter() - started, _peak_rss_mb()))
+
+def _run(file_format: str, batch_size: int):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(file_format, batch_size, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def _report(label: str, rows: int, result) -> None:
+    size, elapsed, peak_mb = result
+    print(f"  {label:<8} {rows:>9} rows  {rows / elapsed:>10,.0f} rows/s  {elapsed:7.2f}s  body {size / 1024 / 1024:7.1f} MB  peak RSS {peak_mb:7.1f} MB")
+
+def main(rows: int, legacy_rows: int, batch_size: int) -> None:
+    for count in sorted({rows // 10, rows}):
+        _seed_shipments(count)
+        print(f"export {count:,} shipments")
+        for file_format in ("csv", "ndjson", "xlsx"):
+            _report(file_format, count, _run(file_format, batch_size))
+    
+    if legacy_rows:
+        _seed_shipments(legacy_rows)
+        print(f"export {legacy_rows:,} shipments")
+        _report("legacy", legacy_rows, _run("legacy", batch_size))
+        _report("csv", legacy_rows, _run("csv", batch_size))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+    main(args.rows, args.legacy_rows, args.batch_size)
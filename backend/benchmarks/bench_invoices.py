@@ -0,0 +1,108 @@
+"""Invoice rendering: legacy per-request reportlab setup vs the preloaded process pool, single and batch.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_invoices --invoices 200 --workers 4
+"""
+import argparse
+import asyncio
+import io
+import time
+from app.core.config import settings
+from app.services.invoices import InvoiceRenderer
+
+ROWS = [
+    ['Shipment ID:', '42'],
+    ['Origin:', 'Cape Town'],
+    ['Destination:', 'Johannesburg'],
+    ['Status:', 'IN_TRANSIT'],
+    ['Estimated ETA:', '2024-05-01 12:00'],
+    ['Distance:', '1402.3 km'],
+    ['Confidence Score:', '87.5%'],
+    ['Client Name:', 'Acme'],
+    ['Client Email:', 'ops@acme.example'],
+    ['Product:', 'Widgets'],
+    ['Category:', 'Hardware'],
+    ['Weight:', '120.0 kg'],
+    ['Value:', '$1500.00'],
+]
+
+def _legacy_invoice(rows) -> bytes:
+    # What the endpoint did before: import, build styles and copy the buffer per request
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], fontSize=24, spaceAfter=30, alignment=1)
+    table = Table(rows, colWidths=[2*inch, 4*inch])
+    table.setStyle([
+        ('BACKGROUND', (0, 0), (0, -1), colors.grey),
+        ('TEXTCOLOR', (0, 0), (0, -1), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (1, 0), (1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    doc.build([Paragraph("SHIPMENT INVOICE", title_style), Spacer(1, 12), table])
+    buffer.seek(0)
+    return io.BytesIO(buffer.read()).getvalue()
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    """Worst delay seen by a 1 ms ticker, i.e. how long the event loop was blocked"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - started - 0.001)
+    return worst * 1000
+
+async def _measure(label: str, invoices: int, work) -> None:
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_loop_lag(stop))
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    print(f"{label:<34} {invoices / elapsed:8.1f} invoices/s   worst loop stall {await lag:8.1f} ms")
+
+async def main_async(invoices: int, workers: int) -> None:
+    renderer = InvoiceRenderer(workers)
+    renderer.warm()
+    await renderer.render(ROWS)
+    batch = [ROWS] * invoices
+    
+    async def legacy():
+        # Sync endpoint body on the event loop, as `async def` handlers would run it
+        for rows in batch:
+            _legacy_invoice(rows)
+            await asyncio.sleep(0)
+    
+    async def pooled():
+        for rows in batch:
+            await renderer.render(rows)
+    
+    async def pooled_concurrent():
+        await asyncio.gather(*(renderer.render(rows) for rows in batch))
+    
+    try:
+        await _measure("legacy inline, sequential", invoices, legacy)
+        await _measure("pool, sequential requests", invoices, pooled)
+        await _measure("pool, concurrent requests", invoices, pooled_concurrent)
+        await _measure("batch zip (render_many)", invoices, lambda: renderer.render_many(batch))
+        await _measure("batch merged pdf (render_merged)", invoices, lambda: renderer.render_merged(batch))
+    finally:
+        renderer.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--invoices", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=settings.invoice_workers)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.invoices, args.workers))
@@ -0,0 +1,65 @@
+"""k-nearest available drivers: in-memory grid index vs a linear scan over every driver.
+
+Drivers are scattered over cities in a 20 x 20 degree region. Run from the backend directory:
+
+    python -m benchmarks.bench_nearby_drivers --drivers 100000 --queries 2000
+"""
+import argparse
+import random
+import statistics
+import time
+from app.core.config import settings
+from app.services.driver_locations import DriverGridIndex, haversine_km
+
+def _drivers(count: int, rng: random.Random):
+    cities = [(rng.uniform(-35.0, -15.0), rng.uniform(15.0, 35.0)) for _ in range(200)]
+    for driver_id in range(1, count + 1):
+        lat, lon = rng.choice(cities)
+        yield driver_id, lat + rng.gauss(0, 0.3), lon + rng.gauss(0, 0.3), rng.random() < 0.6, rng.choice((500.0, 3500.0, 20000.0))
+
+def _linear(drivers, lat: float, lon: float, k: int, min_capacity: float):
+    found = sorted(
+        (haversine_km(lat, lon, d_lat, d_lon), driver_id)
+        for driver_id, d_lat, d_lon, available, capacity in drivers
+        if available and capacity >= min_capacity
+    )
+    return [(driver_id, distance) for distance, driver_id in found[:k]]
+
+def _latency_ms(fn, queries) -> float:
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        fn(*query)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, sorted(samples)[int(len(samples) * 0.99)] * 1000
+
+def main(count: int, queries: int, k: int) -> None:
+    rng = random.Random(11)
+    drivers = list(_drivers(count, rng))
+    index = DriverGridIndex(settings.driver_grid_cell_degrees)
+    started = time.perf_counter()
+    for driver in drivers:
+        index.upsert(*driver)
+    print(f"indexed {count:,} drivers in {time.perf_counter() - started:.2f}s")
+    
+    points = [(rng.uniform(-35.0, -15.0), rng.uniform(15.0, 35.0), k, rng.choice((0.0, 3500.0, 20000.0))) for _ in range(queries)]
+    for lat, lon, _, capacity in points[:50]:
+        assert [d for d, _ in index.nearest(lat, lon, k, capacity)] == [d for d, _ in _linear(drivers, lat, lon, k, capacity)]
+    
+    grid_p50, grid_p99 = _latency_ms(lambda lat, lon, k, cap: index.nearest(lat, lon, k, cap), points)
+    linear_p50, linear_p99 = _latency_ms(lambda lat, lon, k, cap: _linear(drivers, lat, lon, k, cap), points[:max(20, queries // 50)])
+    print(f"k={k}  grid index   p50 {grid_p50:8.3f} ms   p99 {grid_p99:8.3f} ms")
+    print(f"k={k}  linear scan  p50 {linear_p50:8.3f} ms   p99 {linear_p99:8.3f} ms")
+    
+    started = time.perf_counter()
+    for driver_id, lat, lon, available, capacity in drivers[:10000]:
+        index.upsert(driver_id, lat + 0.01, lon + 0.01, available, capacity)
+    print(f"moves: {10000 / (time.perf_counter() - started):,.0f} location updates/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+    main(args.drivers, args.queries, args.k)
@@ -0,0 +1,89 @@
+"""Optimal-driver selection at fleet scale: SQL top-k on ix_drivers_dispatch vs loading the fleet into Python.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_optimal_driver --drivers 100000 --shipments 200000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_DIR}/bench.db")
+
+from sqlalchemy import and_
+from app.core.database import SessionLocal, engine
+from app.models import Base, Driver as DriverModel, Shipment as ShipmentModel
+from app.services.driver_selection import rank_drivers
+from app.services.importer import bulk_insert
+
+CITIES = ["Cape Town", "Johannesburg", "Durban", "Pretoria", "Port Elizabeth", "Bloemfontein", "Polokwane", "Nelspruit"]
+STATUSES = ("pending", "in_transit", "delivered", "delayed")
+
+def _seed(drivers: int, shipments: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    db = SessionLocal()
+    try:
+        names = ["name", "license_number", "phone", "email", "vehicle_type", "capacity", "availability", "current_location", "rating"]
+        rows = [
+            (f"Driver {i}", f"LIC{i:07d}", "555-0100", f"driver{i}@example.com", "Truck",
+             rng.choice((500.0, 1000.0, 3500.0, 8000.0, 20000.0)), rng.random() < 0.6, rng.choice(CITIES),
+             round(rng.uniform(3.0, 5.0), 1))
+            for i in range(drivers)
+        ]
+        bulk_insert(db, DriverModel.__table__, names, rows)
+        names = ["client_id", "product_id", "driver_id", "transporter_id", "origin", "destination", "estimated_eta", "status"]
+        rows = [
+            (1, 1, rng.randint(1, drivers), 1, rng.choice(CITIES), rng.choice(CITIES), "2024-01-01 00:00:00", rng.choice(STATUSES))
+            for _ in range(shipments)
+        ]
+        bulk_insert(db, ShipmentModel.__table__, names, rows)
+        db.commit()
+    finally:
+        db.close()
+
+def _legacy(db, weight: float):
+    # What the endpoint did before: every eligible driver into Python, then max by rating
+    drivers = db.query(DriverModel).filter(
+        and_(DriverModel.availability == True, DriverModel.capacity >= weight)  # noqa: E712
+    ).all()
+    return max(drivers, key=lambda d: d.rating)
+
+def _time(db, fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        db.expunge_all()
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+def main(drivers: int, shipments: int, repeat: int) -> None:
+    _seed(drivers, shipments)
+    db = SessionLocal()
+    try:
+        cases = [
+            ("legacy load-all + max()", lambda w: _legacy(db, w)),
+            ("SQL top-1", lambda w: rank_drivers(db, w, k=1)),
+            ("SQL top-10", lambda w: rank_drivers(db, w, k=10)),
+            ("SQL top-10 + proximity + load", lambda w: rank_drivers(db, w, k=10, origin="Durban", balance_load=True)),
+        ]
+        print(f"{drivers:,} drivers, {shipments:,} shipments (median ms)")
+        print(f"{'':<32}" + "".join(f"{f'>= {w:,.0f} kg':>14}" for w in (100.0, 5000.0, 15000.0)))
+        for label, fn in cases:
+            print(f"{label:<32}" + "".join(f"{_time(db, lambda: fn(w), repeat):14.2f}" for w in (100.0, 5000.0, 15000.0)))
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drivers", type=int, default=100_000)
+    parser.add_argument("--shipments", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.drivers, args.shipments, args.repeat)
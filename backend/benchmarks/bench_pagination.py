@@ -0,0 +1,72 @@
+"""Deep-page latency of GET /clients/ with skip/limit offsets vs keyset cursors.
+
+Seeds a SQLite database with millions of clients (reused on later runs), then
+times fetching the same page both ways. Run from the backend directory:
+
+    python -m benchmarks.bench_pagination --rows 2000000 --pages 1000 10000
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_pagination.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}")
+
+import httpx
+from app.api.pagination import encode_cursor
+from main import app
+
+def _seed(rows: int) -> None:
+    conn = sqlite3.connect(DB_PATH)
+    existing = conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0]
+    if existing < rows:
+        print(f"seeding {rows - existing} clients into {DB_PATH} ...")
+        batch = 100_000
+        for start in range(existing, rows, batch):
+            conn.executemany(
+                "INSERT INTO clients (name, email, phone, address, city, country, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)",
+                (
+                    (f"Client {i}", f"client{i}@example.com", "+27 21 555 0000", f"{i} Main Road", "Cape Town", "South Africa")
+                    for i in range(start, min(start + batch, rows))
+                )
+            )
+            conn.commit()
+    conn.close()
+
+async def _time(api: httpx.AsyncClient, url: str, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await api.get(url)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return statistics.median(samples)
+
+async def main(rows: int, pages: list, limit: int, repeat: int) -> None:
+    _seed(rows)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as api:
+        for page in pages:
+            skip = (page - 1) * limit
+            # The cursor a client would hold after reading the previous page
+            conn = sqlite3.connect(DB_PATH)
+            last_id = conn.execute("SELECT id FROM clients ORDER BY id LIMIT 1 OFFSET ?", (skip - 1,)).fetchone()[0]
+            conn.close()
+            
+            offset_ms = await _time(api, f"/clients/?skip={skip}&limit={limit}", repeat)
+            keyset_ms = await _time(api, f"/clients/?cursor={encode_cursor(last_id)}&limit={limit}", repeat)
+            print(f"page {page:>6} (limit {limit})  offset={offset_ms:8.2f} ms  keyset={keyset_ms:8.2f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.pages, args.limit, args.repeat))
@@ -0,0 +1,65 @@
+"""Polled GET endpoints with and without the response cache: full render vs cache hit vs 304.
+
+Requests go through the whole ASGI stack in-process, so the numbers exclude the network.
+Run from the backend directory:
+
+    python -m benchmarks.bench_response_cache --clients 1000 --requests 500
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_DIR}/bench.db")
+
+import httpx
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Client as ClientModel
+from app.services.importer import bulk_insert
+import main
+
+ENDPOINTS = ["/dashboard/summary", "/dashboard/charts/revenue_trend", "/analytics/metrics", "/clients/?limit=100"]
+
+def _seed(clients: int) -> None:
+    db = SessionLocal()
+    try:
+        rows = [(f"Client {i}", f"client{i}@example.com", "555-0100", "1 Main St", "Cape Town", "ZA") for i in range(clients)]
+        bulk_insert(db, ClientModel.__table__, ["name", "email", "phone", "address", "city", "country"], rows)
+        db.commit()
+    finally:
+        db.close()
+
+async def _latency(client: httpx.AsyncClient, path: str, requests: int, headers=None) -> float:
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        samples.append(time.perf_counter() - started)
+        assert response.status_code in (200, 304), response.status_code
+    return statistics.median(samples) * 1000
+
+async def main_async(clients: int, requests: int) -> None:
+    _seed(clients)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'endpoint':<36} {'uncached':>10} {'hit':>10} {'304':>10}  (median ms)")
+        for path in ENDPOINTS:
+            settings.response_cache_enabled = False
+            uncached = await _latency(client, path, requests)
+            
+            settings.response_cache_enabled = True
+            etag = (await client.get(path)).headers["etag"]
+            hit = await _latency(client, path, requests)
+            not_modified = await _latency(client, path, requests, headers={"If-None-Match": etag})
+            print(f"{path:<36} {uncached:10.3f} {hit:10.3f} {not_modified:10.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main_async(args.clients, args.requests))
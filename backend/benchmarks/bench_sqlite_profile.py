@@ -0,0 +1,120 @@
+"""Concurrent reads and writes on SQLite: the old engine setup vs the tuned engine profile.
+
+Reader threads poll dashboard-style aggregates while writer threads commit small
+batches of shipments, as uploads do. Run from the backend directory:
+
+    python -m benchmarks.bench_sqlite_profile --seconds 10 --readers 4 --writers 4 --batch 50
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, create_engine, func, insert, select
+from sqlalchemy.exc import OperationalError
+from app.core.database import create_db_engine
+from app.models import Base, Shipment as ShipmentModel
+
+STATUSES = ("pending", "in_transit", "delivered", "delayed")
+
+def _rows(start: int, count: int):
+    now = datetime.utcnow()
+    return [
+        {
+            "client_id": 1, "product_id": 1, "driver_id": 1 + i % 500, "transporter_id": 1,
+            "origin": f"City {i % 40}", "destination": f"City {(i * 7) % 40}",
+            "estimated_eta": now + timedelta(days=2), "status": STATUSES[i % 4], "transport_mode": "road",
+            "created_at": now - timedelta(minutes=i)
+        }
+        for i in range(start, start + count)
+    ]
+
+def _run(engine, seconds: float, readers: int, writers: int, batch: int, seed_rows: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for start in range(0, seed_rows, 10000):
+            connection.execute(insert(ShipmentModel.__table__), _rows(start, min(10000, seed_rows - start)))
+    
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"reads": 0, "writes": 0, "errors": 0, "read_latency": [], "write_latency": []}
+    
+    def reader():
+        query = (
+            select(ShipmentModel.status, func.count())
+            .where(ShipmentModel.driver_id == bindparam("driver_id"))
+            .group_by(ShipmentModel.status)
+        )
+        driver_id = 0
+        while not stop.is_set():
+            driver_id = driver_id % 500 + 1
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(query, {"driver_id": driver_id}).all()
+            except OperationalError:
+                with lock:
+                    stats["errors"] += 1
+                continue
+            with lock:
+                stats["reads"] += 1
+                stats["read_latency"].append(time.perf_counter() - started)
+    
+    def writer(offset: int):
+        start = seed_rows + offset * 10_000_000
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with engine.begin() as connection:
+                    connection.execute(insert(ShipmentModel.__table__), _rows(start, batch))
+            except OperationalError:
+                with lock:
+                    stats["errors"] += 1
+                continue
+            start += batch
+            with lock:
+                stats["writes"] += 1
+                stats["write_latency"].append(time.perf_counter() - started)
+    
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+    return stats
+
+def _p99(samples) -> float:
+    return sorted(samples)[int(len(samples) * 0.99)] * 1000 if samples else float("nan")
+
+def main(seconds: float, readers: int, writers: int, batch: int, seed_rows: int) -> None:
+    profiles = {
+        # What app/core/database.py used to build
+        "default": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "tuned": create_db_engine
+    }
+    print(f"{readers} readers, {writers} writers x {batch} rows/commit, {seed_rows:,} seeded rows, {seconds:.0f}s each")
+    print(f"{'profile':<9} {'reads/s':>9} {'read p50':>9} {'read p99':>9} {'commits/s':>10} {'write p99':>10} {'errors':>7}")
+    for name, build in profiles.items():
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        stats = _run(build(f"sqlite:///{path}"), seconds, readers, writers, batch, seed_rows)
+        read_p50 = statistics.median(stats["read_latency"]) * 1000 if stats["read_latency"] else float("nan")
+        print(
+            f"{name:<9} {stats['reads'] / seconds:9.0f} {read_p50:8.2f}ms {_p99(stats['read_latency']):8.2f}ms "
+            f"{stats['writes'] / seconds:10.1f} {_p99(stats['write_latency']):8.2f}ms {stats['errors']:7d}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--seed-rows", type=int, default=200_000)
+    args = parser.parse_args()
+    main(args.seconds, args.readers, args.writers, args.batch, args.seed_rows)
@@ -0,0 +1,80 @@
+"""Local stand-ins for the OpenRouteService and OpenWeather APIs used by the benchmarks."""
+import asyncio
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+stub_app = FastAPI()
+stub_app.state.latency = 0.0
+stub_app.state.calls = {}
+
+def _count(name: str) -> None:
+    stub_app.state.calls[name] = stub_app.state.calls.get(name, 0) + 1
+
+def _coords_for(text: str) -> list:
+    # Stable pseudo-coordinates so the same address always geocodes to the same point
+    seed = sum(ord(c) for c in text)
+    return [(seed % 360) - 180 + 0.5, (seed % 170) - 85 + 0.5]
+
+@stub_app.get("/ors/geocode/search")
+async def geocode(text: str, size: int = 1):
+    _count("geocode")
+    await asyncio.sleep(stub_app.state.latency)
+    return {"features": [{"geometry": {"coordinates": _coords_for(text)}}]}
+
+@stub_app.post("/ors/directions/{profile}")
+async def directions(profile: str, request: Request):
+    _count("directions")
+    body = await request.json()
+    await asyncio.sleep(stub_app.state.latency)
+    (lon1, lat1), (lon2, lat2) = body["coordinates"]
+    distance = (abs(lon1 - lon2) + abs(lat1 - lat2)) * 111000
+    return {"routes": [{
+        "summary": {"distance": distance, "duration": distance / 20},
+        "geometry": {"type": "LineString", "coordinates": [[lon1, lat1], [lon2, lat2]]}
+    }]}
+
+@stub_app.post("/ors/matrix/{profile}")
+async def matrix(profile: str, request: Request):
+    _count("matrix")
+    body = await request.json()
+    await asyncio.sleep(stub_app.state.latency)
+    locations = body["locations"]
+    distances = [
+        [(abs(locations[s][0] - locations[d][0]) + abs(locations[s][1] - locations[d][1])) * 111000
+         for d in body["destinations"]]
+        for s in body["sources"]
+    ]
+    return {"distances": distances, "durations": [[value / 20 for value in row] for row in distances]}
+
+@stub_app.get("/owm/weather")
+async def weather(lat: float, lon: float, appid: str, units: str = "metric"):
+    _count("weather")
+    await asyncio.sleep(stub_app.state.latency)
+    return {"weather": [{"main": "Rain"}], "wind": {"speed": 5.0}, "visibility": 8000}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def run_stub_server(latency: float = 0.0):
+    """Serve the stub APIs on a free local port, yielding (ors_url, owm_url)"""
+    stub_app.state.latency = latency
+    stub_app.state.calls = {}
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(stub_app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/ors", f"http://127.0.0.1:{port}/owm"
+    finally:
+        server.should_exit = True
+        thread.join()
@@ -1,20 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.core.database import get_db, engine
+from app.core.database import SessionLocal, async_engine, get_db, engine
 from app.models import Base
-from app.api import clients, products, drivers, transporters, shipments, upload
+from app.api import clients, products, drivers, transporters, shipments, upload, analytics, dashboard
+from app.api.pagination import NEXT_CURSOR_HEADER
+from app.services.eta_service import eta_service
+from app.services.dashboard_stats import ensure_daily_stats, ensure_shipment_columns
+from app.services.driver_locations import ensure_location_columns, load_driver_index
+from app.services.import_jobs import import_jobs
+from app.services.invoices import PDF_AVAILABLE, invoice_renderer
+from app.services.lane_rollups import ensure_lane_stats, lane_aggregator
+from app.services.response_cache import ResponseCacheMiddleware
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+ensure_location_columns(engine)
+ensure_shipment_columns(engine)
+
+def _ensure_aggregates() -> None:
+    db = SessionLocal()
+    try:
+        ensure_daily_stats(db)
+        ensure_lane_stats(db)
+    finally:
+        db.close()
+
+def _load_driver_locations() -> None:
+    db = SessionLocal()
+    try:
+        load_driver_index(db)
+    finally:
+        db.close()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(_ensure_aggregates)
+    await asyncio.to_thread(_load_driver_locations)
+    await eta_service.startup()
+    await lane_aggregator.start()
+    if PDF_AVAILABLE:
+        invoice_renderer.warm()
+    yield
+    await lane_aggregator.stop()
+    await eta_service.shutdown()
+    await asyncio.to_thread(import_jobs.shutdown)
+    await asyncio.to_thread(invoice_renderer.shutdown)
+    await async_engine.dispose()
 
 app = FastAPI(
     title=settings.app_name,
     description="AI-powered shipment ETA prediction system",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Response cache for polled GET endpoints; added first so CORS wraps cached responses too
+app.add_middleware(ResponseCacheMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +68,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 # Include routers
@@ -31,6 +78,8 @@ app.include_router(drivers.router, prefix="/drivers", tags=["drivers"])
 app.include_router(transporters.router, prefix="/transporters", tags=["transporters"])
 app.include_router(shipments.router, prefix="/shipments", tags=["shipments"])
 app.include_router(upload.router, prefix="/upload", tags=["upload"])
+app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+app.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,5 @@
+import os
+import tempfile
+
+# Before anything imports app.core.database, so the tests never touch a real database
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
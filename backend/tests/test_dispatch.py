@@ -0,0 +1,89 @@
+"""Dispatch plans must never load a driver beyond its capacity, counting what it already carries."""
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from sqlalchemy import text
+from app.core.database import SessionLocal, engine
+from app.models import (
+    Base, Client as ClientModel, Driver as DriverModel, Product as ProductModel, Shipment as ShipmentModel
+)
+from app.services import dispatch
+from app.services.dispatch import DispatchProblem, load_problem, solve
+
+def _problem(weights, capacities, loads=None) -> DispatchProblem:
+    return DispatchProblem(
+        shipment_ids=np.arange(1, len(weights) + 1),
+        origins=["Cape Town"] * len(weights),
+        weights=np.array(weights, dtype=np.float64),
+        driver_ids=np.arange(1, len(capacities) + 1),
+        locations=["Cape Town"] * len(capacities),
+        capacities=np.array(capacities, dtype=np.float64),
+        ratings=np.full(len(capacities), 5.0),
+        loads=None if loads is None else np.array(loads, dtype=np.float64)
+    )
+
+def _carried(problem: DispatchProblem, plan) -> dict:
+    weights = dict(zip(problem.shipment_ids.tolist(), problem.weights.tolist()))
+    carried = {}
+    for assignment in plan.assignments:
+        carried[assignment["driver_id"]] = carried.get(assignment["driver_id"], 0.0) + weights[assignment["shipment_id"]]
+    return carried
+
+@pytest.fixture(params=[True, False], ids=["hungarian", "greedy"])
+def solver(request, monkeypatch):
+    monkeypatch.setattr(dispatch, "SCIPY_AVAILABLE", request.param)
+
+def test_slots_share_one_capacity(solver):
+    problem = _problem([900, 900], [1000])
+    plan = solve(problem, {}, max_per_driver=2)
+    assert len(plan.assignments) == 1
+    assert len(plan.unassigned) == 1
+
+def test_current_load_counts_against_capacity(solver):
+    problem = _problem([600, 400], [1000], loads=[500])
+    plan = solve(problem, {}, max_per_driver=2)
+    assert [a["shipment_id"] for a in plan.assignments] == [2]
+    assert plan.unassigned == [1]
+
+def test_fills_drivers_up_to_capacity(solver):
+    problem = _problem([300, 300, 300, 900, 500], [1000, 1000], loads=[100, 0])
+    plan = solve(problem, {}, max_per_driver=3)
+    remaining = problem.capacities - problem.loads
+    for driver_id, weight in _carried(problem, plan).items():
+        assert weight <= remaining[driver_id - 1]
+        assert sum(a["driver_id"] == driver_id for a in plan.assignments) <= 3
+    assert len(plan.assignments) == 4
+
+def test_load_problem_reads_active_loads():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        for table in ("shipments", "clients", "products", "drivers"):
+            db.execute(text(f"DELETE FROM {table}"))
+        db.add(ClientModel(id=1, name="Client", email="client@example.com", phone="555-0100", address="1 Main St", city="Cape Town", country="ZA"))
+        db.add_all([
+            ProductModel(id=i, name=f"Product {i}", category="General", weight=weight, dimensions="1x1x1", value=1.0)
+            for i, weight in ((1, 600.0), (2, 500.0))
+        ])
+        db.add(DriverModel(id=1, name="Driver", license_number="L-1", phone="555-0101", email="driver@example.com",
+                           vehicle_type="Van", capacity=1000.0, current_location="Cape Town"))
+        eta = datetime.utcnow() + timedelta(days=1)
+        db.add_all([
+            # Already on the road with the driver, and delivered (no longer on board)
+            ShipmentModel(id=1, client_id=1, product_id=2, driver_id=1, transporter_id=1, origin="Cape Town",
+                          destination="Durban", estimated_eta=eta, status="in_transit"),
+            ShipmentModel(id=2, client_id=1, product_id=2, driver_id=1, transporter_id=1, origin="Cape Town",
+                          destination="Durban", estimated_eta=eta, status="delivered"),
+            # Pending, so it is being dispatched rather than counted as load
+            ShipmentModel(id=3, client_id=1, product_id=1, driver_id=1, transporter_id=1, origin="Cape Town",
+                          destination="Durban", estimated_eta=eta, status="pending"),
+        ])
+        db.commit()
+        
+        problem = load_problem(db)
+        assert problem.shipment_ids.tolist() == [3]
+        assert problem.loads.tolist() == [500.0]
+        plan = solve(problem, {}, max_per_driver=2)
+        assert plan.unassigned == [3]
+    finally:
+        db.close()
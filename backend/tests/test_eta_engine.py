@@ -0,0 +1,31 @@
+"""The vectorized engine in app.logic.eta must score exactly like the scalar ETAService path."""
+import asyncio
+import itertools
+import pytest
+from app.core.config import settings
+from app.logic.eta import confidence_scores, score_etas
+from app.services.eta_service import eta_service
+
+DISTANCES = (0, 9999, 10000, 49999, 50000, 2_000_000)
+WEATHER_FACTORS = (1.0, 1.1, 1.15, 1.3, 1.5)
+
+def test_confidence_scores_match_scalar():
+    grid = list(itertools.product(DISTANCES, WEATHER_FACTORS, (True, False)))
+    distance, weather, has_geometry = map(list, zip(*grid))
+    expected = [eta_service._calculate_confidence_score(*row) for row in grid]
+    assert confidence_scores(distance, weather, has_geometry).tolist() == pytest.approx(expected)
+
+@pytest.mark.parametrize("weight, priority, transport_mode", itertools.product(
+    (10, 1001), ("standard", "urgent", "low"), ("road", "air", "sea")
+))
+def test_ai_confidence_matches_prediction(monkeypatch, weight, priority, transport_mode):
+    # Without API keys calculate_eta falls back to a fixed 50 km route with no geometry and clear weather
+    monkeypatch.setattr(settings, "openrouteservice_api_key", None)
+    monkeypatch.setattr(settings, "openweather_api_key", None)
+    eta_service.prediction_cache.clear()
+    shipment = {"weight": weight, "priority": priority, "transport_mode": transport_mode}
+    prediction = asyncio.run(eta_service.predict_eta_with_ai("Cape Town", "Durban", shipment))
+    
+    scores = score_etas(50000, 3600, 1.0, False, [weight], [priority], [transport_mode])
+    assert prediction["confidence"] == pytest.approx(scores["ai_confidence"][0])
+    assert prediction["risk_level"] == scores["risk_level"][0]
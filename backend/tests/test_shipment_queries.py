@@ -0,0 +1,91 @@
+"""The shipment list must issue a fixed number of SQL statements per page, however many rows it returns."""
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models import (
+    Client as ClientModel, Driver as DriverModel, Product as ProductModel, Shipment as ShipmentModel,
+    Transporter as TransporterModel
+)
+import main
+
+RELATIONS = ("client", "product", "driver", "transporter")
+
+@pytest.fixture(scope="module")
+def client():
+    settings.response_cache_enabled = False
+    return TestClient(main.app)
+
+def _seed(count: int) -> None:
+    """`count` shipments, each with its own client, product, driver and transporter"""
+    db = SessionLocal()
+    try:
+        for table in ("shipments", "clients", "products", "drivers", "transporters"):
+            db.execute(text(f"DELETE FROM {table}"))
+        for i in range(count):
+            db.add_all([
+                ClientModel(id=i + 1, name=f"Client {i}", email=f"client{i}@example.com", phone="555-0100",
+                            address="1 Main St", city="Cape Town", country="ZA"),
+                ProductModel(id=i + 1, name=f"Product {i}", category="General", weight=10.0, dimensions="1x1x1", value=100.0),
+                DriverModel(id=i + 1, name=f"Driver {i}", license_number=f"L-{i}", phone="555-0101",
+                            email=f"driver{i}@example.com", vehicle_type="Van", capacity=1000.0, current_location="Cape Town"),
+                TransporterModel(id=i + 1, name=f"Transporter {i}", contact_person="Ops", email=f"ops{i}@example.com",
+                                 phone="555-0102", vehicle_types=json.dumps(["Van"]), base_rate=1.5),
+            ])
+        db.flush()
+        db.add_all([
+            ShipmentModel(client_id=i + 1, product_id=i + 1, driver_id=i + 1, transporter_id=i + 1,
+                          origin="Cape Town", destination="Durban", estimated_eta=datetime.utcnow() + timedelta(days=2))
+            for i in range(count)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+@contextmanager
+def _count_statements():
+    statements = []
+    
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+
+def _list_statements(client: TestClient, rows: int, include) -> int:
+    _seed(rows)
+    params = {"limit": 100} if include is None else {"limit": 100, "include": include}
+    with _count_statements() as statements:
+        response = client.get("/shipments/", params=params)
+    assert response.status_code == 200
+    assert len(response.json()) == rows
+    return len(statements)
+
+@pytest.mark.parametrize("include, relations", [
+    (None, len(RELATIONS)),
+    (",".join(RELATIONS), len(RELATIONS)),
+    ("client,driver", 2),
+    ("", 0),
+])
+def test_list_statement_count_is_constant(client, include, relations):
+    one = _list_statements(client, 1, include)
+    fifty = _list_statements(client, 50, include)
+    # The page query plus one selectin query per included relation
+    assert one == fifty == 1 + relations
+
+def test_excluded_relations_serialize_as_null(client):
+    _seed(3)
+    with _count_statements() as statements:
+        response = client.get("/shipments/", params={"include": "client,driver"})
+    assert response.status_code == 200
+    assert len(statements) == 3
+    for shipment in response.json():
+        assert shipment["client"] is not None and shipment["driver"] is not None
+        assert shipment["product"] is None and shipment["transporter"] is None